@@ -0,0 +1,217 @@
+import json
+import argparse
+from pathlib import Path
+from transform.partitioning import PARQUET_DIR, parquet_files
+from analysis.catalog import ANALYTICS_DB_PATH, connect_analytics
+
+# Materialized aggregates for the standard analytics queries, kept in the persistent
+# analytics database as per-key partial sums and counts. The Parquet files already
+# folded into the summaries are recorded; on refresh only new files are read and
+# merged into the affected keys, using delta joins so batches of orders, returns
+# and deliveries can land in any order:
+#   delta(returns JOIN orders) = new_returns JOIN all_orders + old_returns JOIN new_orders
+# Revenue is summed as DECIMAL and delivery time as integer microseconds, so the
+# summaries equal a full recompute exactly. If a recorded file changed or was
+# removed, everything is rebuilt.
+
+FACT_TABLES = ["orders", "returns", "deliveries"]
+
+# Summary table -> (key column, {value column: type})
+SUMMARIES = {
+    "agg_product_revenue": ("product_id", {"revenue": "DECIMAL(38,4)", "order_count": "BIGINT"}),
+    "agg_customer_orders": ("customer_id", {"order_count": "BIGINT"}),
+    "agg_product_returns": ("product_id", {"return_count": "BIGINT"}),
+    "agg_courier_delivery": ("courier", {"delivery_us": "HUGEINT", "delivery_count": "BIGINT"}),
+}
+
+REVENUE_DELTA = """
+    SELECT product_id, SUM(CAST(quantity * price_per_unit AS DECIMAL(38,4))) AS revenue, COUNT(*) AS order_count
+    FROM {orders} GROUP BY product_id
+"""
+CUSTOMER_DELTA = """
+    SELECT customer_id, COUNT(*) AS order_count FROM {orders} GROUP BY customer_id
+"""
+RETURNS_DELTA = """
+    SELECT o.product_id, COUNT(*) AS return_count
+    FROM {returns} r JOIN {orders} o ON r.order_id = o.order_id
+    GROUP BY o.product_id
+"""
+DELIVERY_DELTA = """
+    SELECT d.courier,
+           SUM(epoch_us(CAST(d.delivered_at AS TIMESTAMP)) - epoch_us(CAST(o.order_timestamp AS TIMESTAMP))) AS delivery_us,
+           COUNT(*) AS delivery_count
+    FROM {deliveries} d JOIN {orders} o ON d.order_id = o.order_id
+    WHERE d.delivered_at IS NOT NULL AND o.order_timestamp IS NOT NULL
+    GROUP BY d.courier
+"""
+
+# The analytics reports as full queries over the cleaned tables (used by duckdb_analytics and the query service)
+ANALYTICS_QUERIES = {
+    "top_products_by_revenue": """
+        SELECT 
+            p.product_name,
+            SUM(o.quantity * o.price_per_unit) AS total_revenue
+        FROM orders o
+        JOIN products p ON o.product_id = p.product_id
+        GROUP BY p.product_name
+        ORDER BY total_revenue DESC
+        LIMIT 5
+    """,
+    "most_returned_products": """
+        SELECT 
+            p.product_name,
+            COUNT(*) AS num_returns
+        FROM returns r
+        JOIN orders o ON r.order_id = o.order_id
+        JOIN products p ON o.product_id = p.product_id
+        GROUP BY p.product_name
+        ORDER BY num_returns DESC
+        LIMIT 5
+    """,
+    "top_customers_by_orders": """
+        SELECT 
+            name,
+            COUNT(*) AS total_orders
+        FROM orders o
+        JOIN customers c ON o.customer_id = c.customer_id
+        GROUP BY name
+        ORDER BY total_orders DESC
+        LIMIT 5
+    """,
+    "avg_delivery_hours_by_courier": """
+        SELECT 
+            d.courier,
+            ROUND(AVG(EXTRACT(EPOCH FROM (CAST(d.delivered_at AS TIMESTAMP) - CAST(o.order_timestamp AS TIMESTAMP))) / 3600.0), 2) AS avg_delivery_hours
+        FROM deliveries d
+        JOIN orders o ON d.order_id = o.order_id
+        WHERE d.delivered_at IS NOT NULL AND o.order_timestamp IS NOT NULL
+        GROUP BY d.courier
+        ORDER BY avg_delivery_hours
+    """,
+}
+
+# The analytics reports, answered from the summaries joined to the (small) dimensions
+MATERIALIZED_QUERIES = {
+    "top_products_by_revenue": """
+        SELECT p.product_name, CAST(SUM(a.revenue) AS DOUBLE) AS total_revenue
+        FROM agg_product_revenue a
+        JOIN products p ON a.product_id = p.product_id
+        GROUP BY p.product_name
+        ORDER BY total_revenue DESC, p.product_name
+        LIMIT 5
+    """,
+    "most_returned_products": """
+        SELECT p.product_name, CAST(SUM(a.return_count) AS BIGINT) AS num_returns
+        FROM agg_product_returns a
+        JOIN products p ON a.product_id = p.product_id
+        GROUP BY p.product_name
+        ORDER BY num_returns DESC, p.product_name
+        LIMIT 5
+    """,
+    "top_customers_by_orders": """
+        SELECT c.name, CAST(SUM(a.order_count) AS BIGINT) AS total_orders
+        FROM agg_customer_orders a
+        JOIN customers c ON a.customer_id = c.customer_id
+        GROUP BY c.name
+        ORDER BY total_orders DESC, c.name
+        LIMIT 5
+    """,
+    "avg_delivery_hours_by_courier": """
+        SELECT courier, ROUND(delivery_us / delivery_count / 3600e6, 2) AS avg_delivery_hours
+        FROM agg_courier_delivery
+        ORDER BY avg_delivery_hours, courier
+    """,
+}
+
+
+def files_relation(files: list) -> str:
+    paths = ", ".join(f"'{path}'" for path, _, _ in files)
+    return f"read_parquet([{paths}], hive_partitioning = true, union_by_name = true)"
+
+
+def create_summaries(con, replace: bool = False):
+    verb = "CREATE OR REPLACE TABLE" if replace else "CREATE TABLE IF NOT EXISTS"
+    for name, (key, values) in SUMMARIES.items():
+        columns = ", ".join(f"{col} {col_type}" for col, col_type in values.items())
+        con.execute(f"{verb} {name} ({key} VARCHAR, {columns})")
+    con.execute(f"{verb} _agg_sources (table_name VARCHAR PRIMARY KEY, files VARCHAR)")
+
+
+def merge_delta(con, summary: str, delta_sql: str):
+    # Add a delta's partial aggregates to the matching keys; insert keys seen for the first time
+    key, values = SUMMARIES[summary]
+    con.execute(f"CREATE OR REPLACE TEMP TABLE _delta AS {delta_sql}")
+    assignments = ", ".join(f"{col} = COALESCE(s.{col} + d.{col}, s.{col}, d.{col})" for col in values)
+    con.execute(f"UPDATE {summary} s SET {assignments} FROM _delta d WHERE s.{key} IS NOT DISTINCT FROM d.{key}")
+    con.execute(f"INSERT INTO {summary} SELECT d.* FROM _delta d "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {summary} s WHERE s.{key} IS NOT DISTINCT FROM d.{key})")
+    con.execute("DROP TABLE _delta")
+
+
+def refresh_aggregates(con, root: Path = PARQUET_DIR) -> dict:
+    # Fold new fact files into the summaries; returns {table: number of new files} or {"rebuilt": True}
+    create_summaries(con)
+    applied = {name: json.loads(files) for name, files in con.execute("SELECT * FROM _agg_sources").fetchall()}
+    current = {table: parquet_files(table, root) for table in FACT_TABLES}
+
+    # Any recorded file that changed or disappeared invalidates the partial sums
+    rebuild = any(f not in current[table] for table, files in applied.items() if table in current for f in files)
+    if rebuild:
+        create_summaries(con, replace=True)
+        applied = {}
+    old = {table: applied.get(table, []) for table in FACT_TABLES}
+    new = {table: [f for f in current[table] if f not in old[table]] for table in FACT_TABLES}
+
+    if not current["orders"]:
+        raise FileNotFoundError(f"no Parquet files for orders in {root}")
+    all_orders = files_relation(current["orders"])
+    if new["orders"]:
+        new_orders = files_relation(new["orders"])
+        merge_delta(con, "agg_product_revenue", REVENUE_DELTA.format(orders=new_orders))
+        merge_delta(con, "agg_customer_orders", CUSTOMER_DELTA.format(orders=new_orders))
+    for table, summary, delta in (("returns", "agg_product_returns", RETURNS_DELTA),
+                                  ("deliveries", "agg_courier_delivery", DELIVERY_DELTA)):
+        if new[table]:
+            merge_delta(con, summary, delta.format(**{table: files_relation(new[table]), "orders": all_orders}))
+        if old[table] and new["orders"]:
+            merge_delta(con, summary, delta.format(**{table: files_relation(old[table]),
+                                                       "orders": files_relation(new["orders"])}))
+
+    for table in FACT_TABLES:
+        con.execute("INSERT OR REPLACE INTO _agg_sources VALUES (?, ?)", [table, json.dumps(current[table])])
+    return {"rebuilt": True} if rebuild else {table: len(files) for table, files in new.items()}
+
+
+def verify_aggregates(con, root: Path = PARQUET_DIR) -> bool:
+    # Compare the maintained summaries with a full recompute from every Parquet file
+    all_files = {table: files_relation(parquet_files(table, root)) for table in FACT_TABLES}
+    full = {
+        "agg_product_revenue": REVENUE_DELTA.format(**all_files),
+        "agg_customer_orders": CUSTOMER_DELTA.format(**all_files),
+        "agg_product_returns": RETURNS_DELTA.format(**all_files),
+        "agg_courier_delivery": DELIVERY_DELTA.format(**all_files),
+    }
+    ok = True
+    for summary, sql in full.items():
+        diff = con.execute(f"SELECT COUNT(*) FROM ((SELECT * FROM {summary} EXCEPT ALL ({sql})) "
+                           f"UNION ALL (({sql}) EXCEPT ALL SELECT * FROM {summary}))").fetchone()[0]
+        print(f"{'✅' if diff == 0 else '❌'} {summary}: {diff} differing rows")
+        ok &= diff == 0
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the materialized analytics aggregates")
+    parser.add_argument("--db", type=Path, default=ANALYTICS_DB_PATH, help="Persistent database path")
+    parser.add_argument("--verify", action="store_true", help="Check the summaries against a full recompute")
+    args = parser.parse_args()
+
+    con, _ = connect_analytics(args.db)
+    print(f"✅ Aggregates refreshed: {refresh_aggregates(con)}")
+    for name, sql in MATERIALIZED_QUERIES.items():
+        print(f"\n📊 {name}")
+        print(con.execute(sql).df())
+    if args.verify:
+        print()
+        verify_aggregates(con)
+    con.close()
@@ -0,0 +1,47 @@
+import json
+import duckdb
+from pathlib import Path
+from transform.partitioning import PARQUET_DIR, parquet_files, parquet_source
+
+# Persistent analytics database: every cleaned table is a view over its Parquet
+# file(s), so opening the database copies no data. A small catalog table records
+# the reader and the Parquet files behind each view; a view is only recreated
+# when that file list (paths, sizes, mtimes) changes.
+
+ANALYTICS_DB_PATH = Path("duckdb/analytics.duckdb")
+
+TABLES = [
+    "customers", "orders", "inventory", "deliveries", "feedback",
+    "suppliers", "products", "returns", "employees"
+]
+
+
+def refresh_views(con, tables: list = TABLES, root: Path = PARQUET_DIR) -> dict:
+    # (Re)create the views whose Parquet files changed; returns {table: "created" | "unchanged" | "missing"}
+    con.execute("CREATE TABLE IF NOT EXISTS _view_catalog (table_name VARCHAR PRIMARY KEY, reader VARCHAR, files VARCHAR)")
+    known = {name: (reader, files) for name, reader, files in con.execute("SELECT * FROM _view_catalog").fetchall()}
+    status = {}
+    for table in tables:
+        files = parquet_files(table, root)
+        if not files:
+            con.execute(f"DROP VIEW IF EXISTS {table}")
+            con.execute("DELETE FROM _view_catalog WHERE table_name = ?", [table])
+            status[table] = "missing"
+            continue
+        reader, fingerprint = parquet_source(table, root), json.dumps(files)
+        if known.get(table) == (reader, fingerprint):
+            status[table] = "unchanged"
+            continue
+        con.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM {reader}")
+        con.execute("INSERT OR REPLACE INTO _view_catalog VALUES (?, ?, ?)", [table, reader, fingerprint])
+        status[table] = "created"
+    return status
+
+
+def connect_analytics(db_path: Path = ANALYTICS_DB_PATH, tables: list = TABLES, root: Path = PARQUET_DIR,
+                      read_only: bool = False):
+    # Open the persistent analytics database, refreshing stale views unless read-only
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(db_path), read_only=read_only)
+    status = {} if read_only else refresh_views(con, tables, root)
+    return con, status
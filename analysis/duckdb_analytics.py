@@ -1,26 +1,60 @@
 from pathlib import Path
+import argparse
 import duckdb
+import pandas as pd
+from transform.partitioning import parquet_source
+from transform.key_index import load_index, find_orphans
+from analysis.catalog import ANALYTICS_DB_PATH, connect_analytics
+from analysis.aggregates import ANALYTICS_QUERIES, MATERIALIZED_QUERIES, refresh_aggregates
+from analysis.query_cache import QueryCache
+
+parser = argparse.ArgumentParser(description="Run the standard analytics queries on the cleaned Parquet")
+parser.add_argument("--persistent", action="store_true",
+                    help=f"Use the persistent database ({ANALYTICS_DB_PATH}); views are only refreshed when files change")
+parser.add_argument("--db", type=Path, default=ANALYTICS_DB_PATH, help="Persistent database path")
+parser.add_argument("--materialized", action="store_true",
+                    help="Answer the standard reports from incrementally maintained aggregates (implies --persistent)")
+parser.add_argument("--cache", action="store_true",
+                    help="Serve the reports from the query result cache while their input files are unchanged")
+args = parser.parse_args()
 
 # Define path to cleaned parquet files
 cleaned_data_path = Path("output/cleaned_parquet")
 
-# DuckDB in-memory connection
-con = duckdb.connect(database=":memory:")
-
 # Tables to register
 tables = [
     "customers", "orders", "inventory", "deliveries", "feedback",
     "suppliers", "products", "returns", "employees"
 ]
 
-# Register tables
-for table in tables:
-    file_path = cleaned_data_path / f"{table}.parquet"
-    try:
-        con.execute(f"CREATE TABLE {table} AS SELECT * FROM read_parquet('{file_path.as_posix()}')")
-        print(f"✅ Registered: {table}")
-    except Exception as e:
-        print(f"⚠️ Failed to register {table}: {e}")
+if args.persistent or args.materialized:
+    # Persistent database: views survive between runs, only changed tables are re-registered
+    con, status = connect_analytics(args.db, tables, cleaned_data_path)
+    for table, state in status.items():
+        icon = {"created": "✅ Registered", "unchanged": "⏩ Up to date", "missing": "⚠️ No Parquet for"}[state]
+        print(f"{icon}: {table}")
+    if args.materialized:
+        try:
+            print(f"✅ Aggregates refreshed: {refresh_aggregates(con, cleaned_data_path)}")
+        except Exception as e:
+            print(f"⚠️ Aggregate refresh failed, using full queries: {e}")
+            args.materialized = False
+else:
+    # DuckDB in-memory connection
+    con = duckdb.connect(database=":memory:")
+
+    # Register tables as views, so hive-partitioned tables are pruned by the query filters
+    for table in tables:
+        try:
+            con.execute(f"CREATE VIEW {table} AS SELECT * FROM {parquet_source(table, cleaned_data_path)}")
+            print(f"✅ Registered: {table}")
+        except Exception as e:
+            print(f"⚠️ Failed to register {table}: {e}")
+
+query_cache = QueryCache(root=cleaned_data_path) if args.cache else None
+
+def run_query(sql: str):
+    return query_cache.df(con, sql) if query_cache else con.execute(sql).df()
 
 # Basic record counts
 print("\n📊 Table Record Counts:")
@@ -41,29 +75,25 @@ try:
 except Exception as e:
     print("⚠️ Error previewing keys:", e)
 
-# Check join matches
+# Check join matches: probe the products key index instead of joining the full table
 print("\n🔍 Orders with unknown product_id:")
-print(con.execute("""
-    SELECT o.product_id 
-    FROM orders o
-    LEFT JOIN products p ON o.product_id = p.product_id
-    WHERE p.product_id IS NULL
-    LIMIT 10
-""").fetchdf())
+try:
+    products_index = load_index("products", "product_id", cleaned_data_path)
+    print(pd.DataFrame({"product_id": find_orphans(con, "orders", "product_id", products_index, limit=10)}))
+except Exception as e:
+    print(f"⚠️ Key index unavailable ({e}), falling back to a join")
+    print(con.execute("""
+        SELECT o.product_id 
+        FROM orders o
+        LEFT JOIN products p ON o.product_id = p.product_id
+        WHERE p.product_id IS NULL
+        LIMIT 10
+    """).fetchdf())
 
 # 1. Top 5 Products by Revenue
 print("\n📊 Top 5 Products by Revenue")
 try:
-    df = con.execute("""
-        SELECT 
-            p.product_name,
-            SUM(o.quantity * o.price_per_unit) AS total_revenue
-        FROM orders o
-        JOIN products p ON o.product_id = p.product_id
-        GROUP BY p.product_name
-        ORDER BY total_revenue DESC
-        LIMIT 5
-    """).df()
+    df = run_query((MATERIALIZED_QUERIES if args.materialized else ANALYTICS_QUERIES)["top_products_by_revenue"])
     print(df)
 except Exception as e:
     print(f"⚠️ Revenue query failed: {e}")
@@ -71,17 +101,7 @@ except Exception as e:
 # 2. Most Returned Products
 print("\n📦 Most Returned Products")
 try:
-    df = con.execute("""
-        SELECT 
-            p.product_name,
-            COUNT(*) AS num_returns
-        FROM returns r
-        JOIN orders o ON r.order_id = o.order_id
-        JOIN products p ON o.product_id = p.product_id
-        GROUP BY p.product_name
-        ORDER BY num_returns DESC
-        LIMIT 5
-    """).df()
+    df = run_query((MATERIALIZED_QUERIES if args.materialized else ANALYTICS_QUERIES)["most_returned_products"])
     print(df)
 except Exception as e:
     print(f"⚠️ Returns query failed: {e}")
@@ -89,16 +109,7 @@ except Exception as e:
 # 3. Top Customers by Orders
 print("\n🧑‍🤝‍🧑 Top 5 Customers by Orders")
 try:
-    df = con.execute("""
-        SELECT 
-            name,
-            COUNT(*) AS total_orders
-        FROM orders o
-        JOIN customers c ON o.customer_id = c.customer_id
-        GROUP BY name
-        ORDER BY total_orders DESC
-        LIMIT 5
-    """).df()
+    df = run_query((MATERIALIZED_QUERIES if args.materialized else ANALYTICS_QUERIES)["top_customers_by_orders"])
     print(df)
 except Exception as e:
     print(f"⚠️ Customers query failed: {e}")
@@ -106,16 +117,10 @@ except Exception as e:
 # 4. Average Delivery Time by Courier
 print("\n🚚 Average Delivery Time by Courier")
 try:
-    df = con.execute("""
-        SELECT 
-            d.courier,
-            ROUND(AVG(EXTRACT(EPOCH FROM (CAST(d.delivered_at AS TIMESTAMP) - CAST(o.order_timestamp AS TIMESTAMP))) / 3600.0), 2) AS avg_delivery_hours
-        FROM deliveries d
-        JOIN orders o ON d.order_id = o.order_id
-        WHERE d.delivered_at IS NOT NULL AND o.order_timestamp IS NOT NULL
-        GROUP BY d.courier
-        ORDER BY avg_delivery_hours
-    """).df()
+    df = run_query((MATERIALIZED_QUERIES if args.materialized else ANALYTICS_QUERIES)["avg_delivery_hours_by_courier"])
     print(df)
 except Exception as e:
     print(f"⚠️ Delivery time query failed: {e}")
+
+if query_cache:
+    print(f"\n⚡ Query cache: {query_cache.stats()}")
@@ -0,0 +1,136 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+import threading
+import duckdb
+import pyarrow.parquet as pq
+from pathlib import Path
+from transform.partitioning import PARQUET_DIR, list_tables, parquet_files
+
+# Query result cache shared by the analytics script and the dashboard. A result is
+# stored as <cache_dir>/<key>.parquet where the key hashes the normalized SQL, its
+# parameters and the fingerprints (path, size, mtime) of the Parquet files of every
+# table the query reads. A changed input file changes the key, so stale results are
+# never served; they simply age out. Entries are evicted least-recently-used first
+# (by file mtime, touched on every hit) once the cache exceeds its size bound.
+
+CACHE_DIR = Path("output/query_cache")
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+STATS_FILE = "stats.json"
+
+
+def normalize_sql(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
+
+
+class QueryCache:
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES, root: Path = PARQUET_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.root = root
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def input_tables(self, sql: str) -> list:
+        # Tables the query reads; anything unknown (views, summaries, table functions) depends on every table
+        known = list_tables(self.root)
+        try:
+            names = duckdb.get_table_names(sql)
+        except Exception:
+            return known
+        if not names or any(name not in known for name in names):
+            return known
+        return sorted(names)
+
+    def key(self, sql: str, params: list = None, tables: list = None) -> str:
+        tables = self.input_tables(sql) if tables is None else tables
+        fingerprint = {
+            "sql": normalize_sql(sql),
+            "params": [str(p) for p in params or []],
+            "files": {table: parquet_files(table, self.root) for table in tables},
+        }
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+    def query(self, con, sql: str, params: list = None, tables: list = None):
+        # Arrow table for sql, served from disk when the inputs are unchanged
+        path = self.cache_dir / f"{self.key(sql, params, tables)}.parquet"
+        if path.exists():
+            try:
+                result = pq.read_table(path)
+                os.utime(path)
+                self._count("hits")
+                return result
+            except Exception:
+                path.unlink(missing_ok=True)
+        result = con.execute(sql, params).fetch_arrow_table()
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        pq.write_table(result, tmp_path)
+        os.replace(tmp_path, path)
+        self._count("misses")
+        self.evict()
+        return result
+
+    def df(self, con, sql: str, params: list = None, tables: list = None):
+        return self.query(con, sql, params, tables).to_pandas()
+
+    def evict(self):
+        entries = sorted(self.cache_dir.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            self._count("evictions")
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.parquet"):
+            path.unlink(missing_ok=True)
+
+    def _count(self, metric: str):
+        # Per-instance counters plus cumulative counters on disk (shared across processes)
+        with self.lock:
+            setattr(self, metric, getattr(self, metric) + 1)
+            stats_path = self.cache_dir / STATS_FILE
+            try:
+                totals = json.loads(stats_path.read_text())
+            except (OSError, ValueError):
+                totals = {}
+            totals[metric] = totals.get(metric, 0) + 1
+            tmp_path = stats_path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(totals))
+            os.replace(tmp_path, stats_path)
+
+    def stats(self) -> dict:
+        entries = list(self.cache_dir.glob("*.parquet"))
+        try:
+            totals = json.loads((self.cache_dir / STATS_FILE).read_text())
+        except (OSError, ValueError):
+            totals = {}
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+            "total_evictions": totals.get("evictions", 0),
+            "entries": len(entries),
+            "bytes": sum(p.stat().st_size for p in entries),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the query result cache")
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args()
+
+    cache = QueryCache()
+    if args.command == "clear":
+        cache.clear()
+        print(f"🧹 Cleared {cache.cache_dir}")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
@@ -0,0 +1,265 @@
+import os
+import json
+import asyncio
+import argparse
+import duckdb
+import uvicorn
+from pathlib import Path
+from typing import Literal, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
+from transform.partitioning import PARQUET_DIR, list_tables, parquet_source
+from analysis.catalog import ANALYTICS_DB_PATH, connect_analytics
+from analysis.aggregates import ANALYTICS_QUERIES, MATERIALIZED_QUERIES, refresh_aggregates
+from analysis.query_cache import QueryCache
+
+# HTTP query service over the cleaned tables. One DuckDB connection holds a view per
+# table (or, with --materialized, the persistent analytics database and its
+# aggregates); a fixed pool of cursors on it bounds how many queries run at once, and
+# a bounded wait queue turns overload into 429s instead of piling up threads. Each
+# query has a deadline covering execution and streaming; when it passes the cursor is
+# interrupted, and a stream cut short ends with an error rather than as a complete
+# response. Results stream in record batches as Arrow IPC or NDJSON, so neither side
+# holds a full result in memory. Only single SELECT statements are accepted, and the
+# connection is locked to reading files under the cleaned Parquet directory.
+
+POOL_SIZE = 4
+MAX_WAITING = 16
+QUEUE_TIMEOUT_SECONDS = 10
+QUERY_TIMEOUT_SECONDS = 30
+MAX_QUERY_TIMEOUT_SECONDS = 300
+BATCH_ROWS = 10_000
+ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+MEDIA_TYPES = {"arrow": "application/vnd.apache.arrow.stream", "ndjson": "application/x-ndjson"}
+
+
+class QueryRequest(BaseModel):
+    sql: str
+    params: list = []
+    format: Literal["arrow", "ndjson"] = "arrow"
+    timeout: Optional[float] = None
+
+
+def connect_service(root: Path = PARQUET_DIR, materialized: bool = False, db_path: Path = ANALYTICS_DB_PATH):
+    if materialized:
+        con, _ = connect_analytics(db_path, root=root)
+        refresh_aggregates(con, root)
+    else:
+        con = duckdb.connect(database=":memory:")
+        for table in list_tables(root):
+            con.execute(f"CREATE VIEW {table} AS SELECT * FROM {parquet_source(table, root)}")
+    # Queries may only read the cleaned Parquet: no other files, no configuration changes
+    con.execute("SET allowed_directories = ?", [[str(Path(root).resolve()) + os.sep]])
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+    return con
+
+
+def check_select(sql: str):
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error as e:
+        raise HTTPException(400, f"Invalid SQL: {e}")
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise HTTPException(400, "Only a single SELECT statement is accepted")
+
+
+class CursorPool:
+    # Fixed set of cursors on one connection; at most max_waiting requests queue for a free one
+    def __init__(self, con, size: int = POOL_SIZE, max_waiting: int = MAX_WAITING):
+        self.con = con
+        self.size = size
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self.cursors = asyncio.Queue()
+        for _ in range(size):
+            self.cursors.put_nowait(con.cursor())
+
+    async def acquire(self, timeout: float = QUEUE_TIMEOUT_SECONDS):
+        if self.cursors.empty() and self.waiting >= self.max_waiting:
+            raise HTTPException(429, "Too many queries waiting, retry later")
+        self.waiting += 1
+        try:
+            return await asyncio.wait_for(self.cursors.get(), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(503, f"No query slot free within {timeout}s")
+        finally:
+            self.waiting -= 1
+
+    def release(self, cursor):
+        self.cursors.put_nowait(cursor)
+
+    def close(self):
+        while not self.cursors.empty():
+            self.cursors.get_nowait().close()
+        self.con.close()
+
+
+class QueryRun:
+    # One query on a pooled cursor; every blocking DuckDB call runs in a thread under the shared deadline
+    def __init__(self, pool: CursorPool, cursor, timeout: float):
+        self.pool = pool
+        self.cursor = cursor
+        self.loop = asyncio.get_running_loop()
+        self.deadline = self.loop.time() + timeout
+        self.timeout = timeout
+
+    async def call(self, fn, *args):
+        task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=max(self.deadline - self.loop.time(), 0))
+        except asyncio.CancelledError:
+            # Client went away: stop the query before the cursor goes back to the pool
+            self.cursor.interrupt()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        if not done:
+            self.cursor.interrupt()
+            await asyncio.gather(task, return_exceptions=True)
+            raise asyncio.TimeoutError
+        return task.result()
+
+    def release(self):
+        if self.cursor is not None:
+            self.pool.release(self.cursor)
+            self.cursor = None
+
+
+def open_reader(cursor, sql: str, params: list, cache: QueryCache = None):
+    # RecordBatchReader over the result (from the result cache when given)
+    if cache is not None:
+        return cache.query(cursor, sql, params).to_reader(max_chunksize=BATCH_ROWS)
+    return cursor.execute(sql, params).to_arrow_reader(BATCH_ROWS)
+
+
+def next_batch(reader):
+    # None at the end (StopIteration cannot cross the thread boundary)
+    try:
+        return reader.read_next_batch()
+    except StopIteration:
+        return None
+
+
+def encode_batch(batch, fmt: str) -> bytes:
+    if fmt == "arrow":
+        return batch.serialize().to_pybytes()
+    return "".join(json.dumps(row, default=str) + "\n" for row in batch.to_pylist()).encode()
+
+
+async def stream_batches(run: QueryRun, reader, fmt: str):
+    try:
+        if fmt == "arrow":
+            yield reader.schema.serialize().to_pybytes()
+        while True:
+            try:
+                batch = await run.call(next_batch, reader)
+            except asyncio.TimeoutError:
+                # Never end a truncated result cleanly: NDJSON gets an error trailer line, and
+                # raising aborts the connection (no Arrow end-of-stream, no final chunk)
+                message = f"Query exceeded {run.timeout}s, result truncated"
+                print(f"⚠️ {message}")
+                if fmt == "ndjson":
+                    yield (json.dumps({"error": message}) + "\n").encode()
+                raise TimeoutError(message)
+            if batch is None:
+                break
+            yield encode_batch(batch, fmt)
+        if fmt == "arrow":
+            yield ARROW_EOS
+    finally:
+        run.release()
+
+
+async def stream_query(pool: CursorPool, sql: str, params: list, fmt: str, timeout: float = None,
+                       cache: QueryCache = None) -> StreamingResponse:
+    timeout = min(timeout or QUERY_TIMEOUT_SECONDS, MAX_QUERY_TIMEOUT_SECONDS)
+    run = QueryRun(pool, await pool.acquire(), timeout)
+    try:
+        reader = await run.call(open_reader, run.cursor, sql, params, cache)
+    except asyncio.TimeoutError:
+        run.release()
+        raise HTTPException(504, f"Query exceeded {timeout}s")
+    except duckdb.Error as e:
+        run.release()
+        raise HTTPException(400, str(e))
+    except BaseException:
+        run.release()
+        raise
+    # The background task returns the cursor even if the body is never streamed
+    return StreamingResponse(stream_batches(run, reader, fmt), media_type=MEDIA_TYPES[fmt],
+                             background=BackgroundTask(run.release))
+
+
+def create_app(root: Path = PARQUET_DIR, materialized: bool = False, db_path: Path = ANALYTICS_DB_PATH,
+               pool_size: int = POOL_SIZE, use_cache: bool = False) -> FastAPI:
+    named_queries = MATERIALIZED_QUERIES if materialized else ANALYTICS_QUERIES
+    cache = QueryCache(root=root) if use_cache else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.pool = CursorPool(connect_service(root, materialized, db_path), pool_size)
+        print(f"✅ Query service ready: {pool_size} cursors over {root}")
+        yield
+        app.state.pool.close()
+
+    app = FastAPI(title="Lakehouse360 Query Service", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        pool = app.state.pool
+        return {"pool_size": pool.size, "free": pool.cursors.qsize(), "waiting": pool.waiting,
+                "cache": cache.stats() if cache else None}
+
+    @app.get("/tables")
+    async def tables():
+        pool = app.state.pool
+        run = QueryRun(pool, await pool.acquire(), QUERY_TIMEOUT_SECONDS)
+        try:
+            rows = await run.call(lambda: run.cursor.execute(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns "
+                "WHERE table_schema = 'main' ORDER BY table_name, ordinal_position").fetchall())
+        except asyncio.TimeoutError:
+            raise HTTPException(504, "Listing tables timed out")
+        finally:
+            run.release()
+        result = {}
+        for table, column, data_type in rows:
+            result.setdefault(table, []).append({"name": column, "type": data_type})
+        return result
+
+    @app.get("/analytics")
+    async def analytics():
+        return sorted(named_queries)
+
+    @app.get("/analytics/{name}")
+    async def named_query(name: str, format: Literal["arrow", "ndjson"] = "arrow", timeout: Optional[float] = None):
+        if name not in named_queries:
+            raise HTTPException(404, f"Unknown query: {name}")
+        return await stream_query(app.state.pool, named_queries[name], [], format, timeout, cache)
+
+    @app.post("/query")
+    async def query(request: QueryRequest):
+        check_select(request.sql)
+        return await stream_query(app.state.pool, request.sql, request.params, request.format, request.timeout)
+
+    return app
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the cleaned tables and analytics over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="Concurrent queries (DuckDB cursors)")
+    parser.add_argument("--materialized", action="store_true",
+                        help=f"Serve the analytics from the incrementally maintained aggregates in {ANALYTICS_DB_PATH}")
+    parser.add_argument("--db", type=Path, default=ANALYTICS_DB_PATH, help="Persistent database path")
+    parser.add_argument("--cache", action="store_true", help="Serve named analytics from the query result cache")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(PARQUET_DIR, args.materialized, args.db, args.pool_size, args.cache),
+                host=args.host, port=args.port)
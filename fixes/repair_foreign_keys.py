@@ -0,0 +1,110 @@
+import os
+import random
+import argparse
+import duckdb
+from pathlib import Path
+from transform.keys import FOREIGN_KEYS
+from transform.clean_and_export import JSON_DIR, find_source_file
+
+# Repairs every declared foreign key in data/json_files inside DuckDB: each parent
+# key column is loaded once into a numbered key table, orphaned (or missing)
+# references are replaced by a key picked with a seeded hash of the row number, and
+# each child table is rewritten in one COPY, whatever number of keys it holds.
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def source_reader(path: Path) -> str:
+    return f"read_json_auto('{path.as_posix()}')"
+
+def columns_of(con, path: Path) -> list:
+    return [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source_reader(path)}").fetchall()]
+
+def load_parent_keys(con, parent: str, column: str) -> int:
+    # Distinct parent keys as text, numbered 0..n-1 for sampling
+    path = find_source_file(parent)
+    if path is None:
+        raise FileNotFoundError(f"no source file for {parent} in {JSON_DIR}")
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE keys_{parent}_{column} AS
+        SELECT key, (row_number() OVER (ORDER BY key)) - 1 AS idx
+        FROM (SELECT DISTINCT CAST("{column}" AS VARCHAR) AS key
+              FROM {source_reader(path)} WHERE "{column}" IS NOT NULL)
+    """)
+    return con.execute(f"SELECT COUNT(*) FROM keys_{parent}_{column}").fetchone()[0]
+
+def repair_query(path: Path, columns: list, fks: list, key_counts: dict, seed: int) -> str:
+    # One join pass: keep references found in the parent keys, replace the rest
+    joins, replaced, added, orphan_flags = [], [], [], []
+    for i, (column, parent, parent_col) in enumerate(fks):
+        keys = f"keys_{parent}_{parent_col}"
+        pick = f"hash(src._row, {seed}, '{column}') % {key_counts[(parent, parent_col)]}"
+        if column in columns:
+            joins.append(f'LEFT JOIN {keys} valid{i} ON valid{i}.key = CAST(src."{column}" AS VARCHAR)')
+            replaced.append(f'COALESCE(valid{i}.key, pick{i}.key) AS "{column}"')
+            orphan_flags.append(f"valid{i}.key IS NULL AS _orphan{i}")
+        else:
+            added.append(f'pick{i}.key AS "{column}"')
+            orphan_flags.append(f"TRUE AS _orphan{i}")
+        joins.append(f"JOIN {keys} pick{i} ON pick{i}.idx = {pick}")
+    select = "src.*" + (f" REPLACE ({', '.join(replaced)})" if replaced else "")
+    return f"""
+        SELECT {', '.join([select] + added + orphan_flags)}
+        FROM (SELECT *, row_number() OVER () AS _row FROM {source_reader(path)}) src
+        {' '.join(joins)}
+    """
+
+def source_files(table: str) -> list:
+    # Every layout convert_to_json wrote (.jsonl and/or .json); all of them are read downstream
+    return [p for p in (JSON_DIR / f"{table}.jsonl", JSON_DIR / f"{table}.json") if p.exists()]
+
+def repair_file(con, table: str, path: Path, fks: list, key_counts: dict, seed: int):
+    query = repair_query(path, columns_of(con, path), fks, key_counts, seed)
+    con.execute(f"CREATE OR REPLACE TEMP TABLE repaired_{table} AS {query}")
+    flags = [f"_orphan{i}" for i in range(len(fks))]
+    orphans = con.execute(f"SELECT {', '.join(f'COUNT(*) FILTER (WHERE {f})' for f in flags)} "
+                          f"FROM repaired_{table}").fetchone()
+
+    # Write the repaired table once, in the source layout, then swap it in
+    tmp_path = path.with_name(path.name + ".tmp")
+    array = "false" if path.suffix == ".jsonl" else "true"
+    con.execute(f"COPY (SELECT * EXCLUDE (_row, {', '.join(flags)}) FROM repaired_{table} ORDER BY _row) "
+                f"TO '{tmp_path.as_posix()}' (FORMAT JSON, ARRAY {array}, TIMESTAMPFORMAT '{TIMESTAMP_FORMAT}')")
+    os.replace(tmp_path, path)
+    con.execute(f"DROP TABLE repaired_{table}")
+    for (column, parent, _), count in zip(fks, orphans):
+        print(f"✅ Patched {count} {table}.{column} values in {path.name} with valid {parent} keys.")
+
+def repair_table(con, table: str, fks: list, key_counts: dict, seed: int):
+    # The same seed picks the same replacement keys in each layout of the table
+    paths = source_files(table)
+    if not paths:
+        print(f"⚠️ Skipped {table}: no source file in {JSON_DIR}")
+        return
+    for path in paths:
+        repair_file(con, table, path, fks, key_counts, seed)
+
+def repair_foreign_keys(seed: int = None, foreign_keys: list = FOREIGN_KEYS):
+    seed = random.getrandbits(32) if seed is None else seed
+    con = duckdb.connect()
+
+    # Load every parent key column once, before any child (orders is both) is rewritten
+    key_counts = {}
+    for _, _, parent, parent_col in foreign_keys:
+        if (parent, parent_col) not in key_counts:
+            key_counts[(parent, parent_col)] = load_parent_keys(con, parent, parent_col)
+            if key_counts[(parent, parent_col)] == 0:
+                raise ValueError(f"No valid {parent_col} values found in {parent}.")
+
+    children = {}
+    for child, column, parent, parent_col in foreign_keys:
+        children.setdefault(child, []).append((column, parent, parent_col))
+    for child, fks in children.items():
+        repair_table(con, child, fks, key_counts, seed)
+    con.close()
+    print(f"🔑 Foreign keys repaired (seed {seed})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair orphaned foreign keys in data/json_files")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for picking replacement keys")
+    args = parser.parse_args()
+    repair_foreign_keys(args.seed)
@@ -0,0 +1,359 @@
+import zlib
+from functools import lru_cache
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from faker import Faker
+
+# Columnar generation engine: every column is built for a whole batch at once
+# (NumPy for numbers/dates/choices, UUIDs from bulk random bytes, strings
+# sampled from pre-generated Faker vocabularies) and written as Arrow batches.
+
+BATCH_SIZE = 1_000_000
+POOL_SIZE = 10_000
+
+# Default row counts, mirroring the row-by-row generators
+DEFAULT_ROWS = {
+    "customers": 50000,
+    "orders": 50000,
+    "inventory": 10000,
+    "deliveries": 30000,
+    "feedback": 10000,
+    "products": 10000,
+    "suppliers": 1000,
+    "employees": 1000,
+    "returns": 5000,
+}
+
+# Output file and format per table, same as the row-by-row generators
+TABLE_FILES = {
+    "customers": ("customers.csv", "csv"),
+    "orders": ("orders.csv", "csv"),
+    "inventory": ("inventory.csv", "csv"),
+    "deliveries": ("deliveries.csv", "csv"),
+    "feedback": ("feedback.json", "json"),
+    "products": ("products.parquet", "parquet"),
+    "suppliers": ("suppliers.tsv", "tsv"),
+    "employees": ("employees.csv", "csv"),
+    "returns": ("returns.jsonl", "jsonl"),
+}
+
+# Faker vocabularies that string columns are sampled from
+VOCABULARIES = {
+    "first_name": lambda f: f.first_name(),
+    "last_name": lambda f: f.last_name(),
+    "name": lambda f: f.name(),
+    "free_email": lambda f: f.free_email(),
+    "email": lambda f: f.email(),
+    "phone_number": lambda f: f.phone_number(),
+    "address": lambda f: f.address().replace("\n", ", "),
+    "city": lambda f: f.city(),
+    "state": lambda f: f.state(),
+    "postcode": lambda f: f.postcode(),
+    "country": lambda f: f.country(),
+    "word": lambda f: f.word().capitalize(),
+    "company": lambda f: f.company(),
+    "sentence": lambda f: f.sentence(),
+    "sentence_10": lambda f: f.sentence(nb_words=10),
+}
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+UUID_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+
+class VocabPools:
+    def __init__(self, seed: int, size: int = POOL_SIZE):
+        self.seed = seed
+        self.size = size
+        self._pools = {}
+
+    def pool(self, name: str) -> pa.Array:
+        if name not in self._pools:
+            fake = Faker()
+            fake.seed_instance(self.seed ^ zlib.crc32(name.encode()))
+            make = VOCABULARIES[name]
+            self._pools[name] = pa.array([make(fake) for _ in range(self.size)], type=pa.string())
+        return self._pools[name]
+
+    def sample(self, rng: np.random.Generator, name: str, n: int) -> pa.Array:
+        pool = self.pool(name)
+        return pool.take(pa.array(rng.integers(0, len(pool), n)))
+
+
+@lru_cache(maxsize=None)
+def vocab_pools(seed: int) -> VocabPools:
+    # Shared per process, so shards generated by the same worker reuse the pools
+    return VocabPools(seed)
+
+
+# ────────────── COLUMN BUILDERS ──────────────
+def uuid4_column(rng: np.random.Generator, n: int) -> pa.Array:
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    nibbles = np.empty((n, 32), dtype=np.uint8)
+    nibbles[:, 0::2] = raw >> 4
+    nibbles[:, 1::2] = raw & 0x0F
+    text = np.full((n, 36), ord("-"), dtype=np.uint8)
+    text[:, UUID_HEX_POSITIONS] = HEX_DIGITS[nibbles]
+    offsets = np.arange(0, 36 * (n + 1), 36, dtype=np.int32)
+    return pa.StringArray.from_buffers(n, pa.py_buffer(offsets), pa.py_buffer(text))
+
+
+def choice_column(rng: np.random.Generator, options: list, n: int) -> pa.Array:
+    return pa.array(options).take(pa.array(rng.integers(0, len(options), n)))
+
+
+def uniform_column(rng: np.random.Generator, low: float, high: float, n: int) -> pa.Array:
+    return pa.array(np.round(rng.uniform(low, high, n), 2))
+
+
+def int_column(rng: np.random.Generator, low: int, high: int, n: int) -> pa.Array:
+    # Inclusive bounds, like random.randint
+    return pa.array(rng.integers(low, high + 1, n, dtype=np.int64))
+
+
+def bool_column(rng: np.random.Generator, n: int) -> pa.Array:
+    return pa.array(rng.random(n) < 0.5)
+
+
+def date_column(rng: np.random.Generator, start: date, end: date, n: int) -> pa.Array:
+    start_day = (start - date(1970, 1, 1)).days
+    end_day = (end - date(1970, 1, 1)).days
+    days = rng.integers(start_day, end_day + 1, n, dtype=np.int32)
+    return pa.array(days, type=pa.date32())
+
+
+def iso_date_column(rng: np.random.Generator, start: date, end: date, n: int) -> pa.Array:
+    return date_column(rng, start, end, n).cast(pa.string())
+
+
+def iso_datetime_column(rng: np.random.Generator, start: datetime, end: datetime, n: int) -> pa.Array:
+    epoch = datetime(1970, 1, 1)
+    start_s = int((start - epoch).total_seconds())
+    end_s = int((end - epoch).total_seconds())
+    seconds = rng.integers(start_s, end_s + 1, n, dtype=np.int64)
+    return pc.strftime(pa.array(seconds, type=pa.timestamp("s")), format="%Y-%m-%dT%H:%M:%S")
+
+
+# ────────────── TABLE BUILDERS ──────────────
+def customers_batch(rng, vocab, n, now):
+    today = now.date()
+    return pa.RecordBatch.from_pydict({
+        "customer_id": uuid4_column(rng, n),
+        "first_name": vocab.sample(rng, "first_name", n),
+        "last_name": vocab.sample(rng, "last_name", n),
+        "email": vocab.sample(rng, "free_email", n),
+        "phone_number": vocab.sample(rng, "phone_number", n),
+        "date_of_birth": date_column(rng, today - timedelta(days=115 * 365), today, n),
+        "gender": choice_column(rng, ["M", "F"], n),
+        "address": vocab.sample(rng, "address", n),
+        "city": vocab.sample(rng, "city", n),
+        "state": vocab.sample(rng, "state", n),
+        "postcode": vocab.sample(rng, "postcode", n),
+        "country": vocab.sample(rng, "country", n),
+        "signup_date": date_column(rng, today - timedelta(days=3 * 365), today, n),
+        "loyalty_score": uniform_column(rng, 0, 100, n),
+        "preferred_store": choice_column(rng, ["Online", "In-store", "Mobile App"], n),
+        "is_active": bool_column(rng, n),
+    })
+
+
+def orders_batch(rng, vocab, n, now):
+    return pa.RecordBatch.from_pydict({
+        "order_id": uuid4_column(rng, n),
+        "customer_id": uuid4_column(rng, n),
+        "product_id": uuid4_column(rng, n),
+        "product_name": vocab.sample(rng, "word", n),
+        "quantity": int_column(rng, 1, 10, n),
+        "price_per_unit": uniform_column(rng, 5.0, 200.0, n),
+        "currency": pa.array(["AUD"] * n),
+        "payment_method": choice_column(rng, ["Credit Card", "PayPal", "Afterpay", "Bank Transfer"], n),
+        "order_timestamp": iso_datetime_column(rng, now - timedelta(days=365), now, n),
+        "status": choice_column(rng, ["Shipped", "Delivered", "Returned", "Cancelled"], n),
+    })
+
+
+def inventory_batch(rng, vocab, n, now):
+    today = now.date()
+    return pa.RecordBatch.from_pydict({
+        "product_id": uuid4_column(rng, n),
+        "product_name": vocab.sample(rng, "word", n),
+        "stock_level": int_column(rng, 0, 500, n),
+        "warehouse_id": pc.binary_join_element_wise(
+            "WH", pc.utf8_lpad(int_column(rng, 0, 999, n).cast(pa.string()), 3, "0"), ""
+        ),
+        "supplier_id": uuid4_column(rng, n),
+        "restock_date": iso_date_column(rng, today - timedelta(days=182), today + timedelta(days=91), n),
+        "expiry_date": iso_date_column(rng, today + timedelta(days=91), today + timedelta(days=730), n),
+    })
+
+
+def deliveries_batch(rng, vocab, n, now):
+    return pa.RecordBatch.from_pydict({
+        "delivery_id": uuid4_column(rng, n),
+        "order_id": uuid4_column(rng, n),
+        "courier": choice_column(rng, ["AusPost", "Toll", "DHL", "FedEx"], n),
+        "delivery_status": choice_column(rng, ["Scheduled", "Out for Delivery", "Delivered", "Failed"], n),
+        "estimated_arrival": iso_datetime_column(rng, now + timedelta(seconds=1), now + timedelta(days=15), n),
+        "delivered_at": iso_datetime_column(rng, now - timedelta(days=3), now, n),
+        "route": pc.binary_join_element_wise(
+            vocab.sample(rng, "city", n), vocab.sample(rng, "city", n), " → "
+        ),
+    })
+
+
+def feedback_batch(rng, vocab, n, now):
+    return pa.RecordBatch.from_pydict({
+        "supplier_id": uuid4_column(rng, n),
+        "supplier_name": vocab.sample(rng, "company", n),
+        "feedback_score": int_column(rng, 1, 5, n),
+        "feedback_text": vocab.sample(rng, "sentence_10", n),
+        "submitted_at": iso_datetime_column(rng, datetime(now.year, 1, 1), now, n),
+    })
+
+
+def products_batch(rng, vocab, n, now):
+    today = now.date()
+    return pa.RecordBatch.from_pydict({
+        "product_id": uuid4_column(rng, n),
+        "product_name": vocab.sample(rng, "word", n),
+        "category": choice_column(rng, ["Electronics", "Clothing", "Books", "Beauty", "Groceries"], n),
+        "brand": vocab.sample(rng, "company", n),
+        "weight_grams": uniform_column(rng, 100, 5000, n),
+        "price": uniform_column(rng, 5, 1000, n),
+        "currency": pa.array(["AUD"] * n),
+        "release_date": iso_date_column(rng, today - timedelta(days=5 * 365), today, n),
+        "discontinued": bool_column(rng, n),
+        "rating": uniform_column(rng, 1, 5, n),
+        "num_reviews": int_column(rng, 0, 5000, n),
+    })
+
+
+def suppliers_batch(rng, vocab, n, now):
+    return pa.RecordBatch.from_pydict({
+        "supplier_id": uuid4_column(rng, n),
+        "supplier_name": vocab.sample(rng, "company", n),
+        "contact_name": vocab.sample(rng, "name", n),
+        "email": vocab.sample(rng, "email", n),
+        "phone": vocab.sample(rng, "phone_number", n),
+        "country": vocab.sample(rng, "country", n),
+        "rating": choice_column(rng, ["A", "B", "C", "D"], n),
+        "active": choice_column(rng, ["Yes", "No", "yes", "no", "Y", "N"], n),
+        "established_year": int_column(rng, 1990, 2023, n),
+        "num_products_supplied": int_column(rng, 5, 100, n),
+    })
+
+
+def employees_batch(rng, vocab, n, now):
+    today = now.date()
+    roles = ["Warehouse Manager", "Delivery Driver", "Data Entry", "Support Staff", "Inventory Analyst"]
+    return pa.RecordBatch.from_pydict({
+        "employee_id": uuid4_column(rng, n),
+        "full_name": vocab.sample(rng, "name", n),
+        "email": vocab.sample(rng, "email", n),
+        "phone": vocab.sample(rng, "phone_number", n),
+        "hire_date": iso_date_column(rng, today - timedelta(days=10 * 365), today, n),
+        "role": choice_column(rng, roles, n),
+        "shift": choice_column(rng, ["Morning", "Evening", "Night"], n),
+        "salary": uniform_column(rng, 40000, 120000, n),
+        "is_active": choice_column(rng, ["True", "False", "true", "false", "1", "0"], n),
+        "supervisor": vocab.sample(rng, "name", n),
+    })
+
+
+def returns_batch(rng, vocab, n, now):
+    today = now.date()
+    # One in three notes is empty, as in random.choice(["", sentence, sentence])
+    notes = pc.if_else(pa.array(rng.integers(0, 3, n) == 0), "", vocab.sample(rng, "sentence", n))
+    return pa.RecordBatch.from_pydict({
+        "return_id": uuid4_column(rng, n),
+        "order_id": uuid4_column(rng, n),
+        "reason": choice_column(rng, ["Damaged", "Wrong item", "Late delivery", "Other"], n),
+        "refund_amount": uniform_column(rng, 10, 500, n),
+        "currency": pa.array(["AUD"] * n),
+        "return_date": iso_date_column(rng, today - timedelta(days=182), today, n),
+        "processed_by": vocab.sample(rng, "name", n),
+        "status": choice_column(rng, ["Pending", "Approved", "Rejected"], n),
+        "notes": notes,
+    })
+
+
+TABLE_BUILDERS = {
+    "customers": customers_batch,
+    "orders": orders_batch,
+    "inventory": inventory_batch,
+    "deliveries": deliveries_batch,
+    "feedback": feedback_batch,
+    "products": products_batch,
+    "suppliers": suppliers_batch,
+    "employees": employees_batch,
+    "returns": returns_batch,
+}
+
+
+def table_entropy(table_name: str, seed: int, shard: int = None) -> list:
+    # Each table (and shard) draws from its own stream so they stay independent
+    entropy = [seed, zlib.crc32(table_name.encode())]
+    return entropy if shard is None else entropy + [shard]
+
+
+def generate_batches(table_name: str, n: int, seed: int, now: datetime, batch_size: int = BATCH_SIZE,
+                     shard: int = None):
+    rng = np.random.default_rng(table_entropy(table_name, seed, shard))
+    vocab = vocab_pools(seed)
+    build = TABLE_BUILDERS[table_name]
+    for start in range(0, n, batch_size):
+        yield build(rng, vocab, min(batch_size, n - start), now)
+
+
+# ────────────── WRITERS ──────────────
+def _json_lines(batch: pa.RecordBatch) -> str:
+    return batch.to_pandas().to_json(orient="records", lines=True).rstrip("\n")
+
+
+def write_batches(batches, output_path: Path, fmt: str):
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return
+    if fmt == "parquet":
+        with pq.ParquetWriter(output_path, first.schema) as writer:
+            writer.write_batch(first)
+            for batch in batches:
+                writer.write_batch(batch)
+    elif fmt in ("csv", "tsv"):
+        options = pacsv.WriteOptions(delimiter="\t" if fmt == "tsv" else ",")
+        with pacsv.CSVWriter(output_path, first.schema, write_options=options) as writer:
+            writer.write_batch(first)
+            for batch in batches:
+                writer.write_batch(batch)
+    elif fmt == "jsonl":
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(_json_lines(first) + "\n")
+            for batch in batches:
+                f.write(_json_lines(batch) + "\n")
+    elif fmt == "json":
+        # Stream a single JSON array without holding all records in memory
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("[\n" + _json_lines(first).replace("\n", ",\n"))
+            for batch in batches:
+                f.write(",\n" + _json_lines(batch).replace("\n", ",\n"))
+            f.write("\n]\n")
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+
+
+def write_table(table_name: str, output_dir, seed: int, n: int = None, now: datetime = None,
+                batch_size: int = BATCH_SIZE) -> Path:
+    n = DEFAULT_ROWS[table_name] if n is None else n
+    now = (now or datetime.now()).replace(microsecond=0)
+    file_name, fmt = TABLE_FILES[table_name]
+    output_path = Path(output_dir) / file_name
+    write_batches(generate_batches(table_name, n, seed, now, batch_size), output_path, fmt)
+    return output_path
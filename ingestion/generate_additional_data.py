@@ -8,6 +8,7 @@ import os
 from faker import Faker
 import pyarrow as pa
 import pyarrow.parquet as pq
+import argparse
 
 fake = Faker()
 Faker.seed(200)
@@ -94,9 +95,27 @@ def generate_returns(n=5000):
             }
             f.write(json.dumps(record) + "\n")
 
+TABLES = ["products", "suppliers", "employees", "returns"]
+
 if __name__ == "__main__":
-    generate_products()
-    generate_suppliers()
-    generate_employees()
-    generate_returns()
+    parser = argparse.ArgumentParser(description="Generate additional Lakehouse360 datasets")
+    parser.add_argument("--engine", choices=["row", "columnar", "sharded"], default="row",
+                        help="row: one Faker record at a time; columnar: whole Arrow columns per batch; "
+                             "sharded: columnar part files generated in a process pool")
+    parser.add_argument("--scale", type=float, default=1.0, help="Row-count multiplier (sharded engine)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (sharded engine)")
+    args = parser.parse_args()
+
+    if args.engine == "sharded":
+        from ingestion.sharded import generate_sharded
+        generate_sharded(TABLES, output_dir, seed=200, scale=args.scale, workers=args.workers)
+    elif args.engine == "columnar":
+        from ingestion.columnar import write_table
+        for table in TABLES:
+            write_table(table, output_dir, seed=200)
+    else:
+        generate_products()
+        generate_suppliers()
+        generate_employees()
+        generate_returns()
     print("✅ Additional datasets generated: products.parquet, suppliers.tsv, employees.csv, returns.jsonl")
@@ -5,6 +5,7 @@ import random
 import uuid
 import json
 import os
+import argparse
 
 # Setup
 fake = Faker()
@@ -105,11 +106,29 @@ def generate_feedback(n=10000):
     with open(f"{output_dir}/feedback.json", "w") as f:
         json.dump(feedback, f, indent=2)
 
+TABLES = ["customers", "orders", "inventory", "deliveries", "feedback"]
+
 # Main
 if __name__ == "__main__":
-    generate_customers()
-    generate_orders()
-    generate_inventory()
-    generate_deliveries()
-    generate_feedback()
+    parser = argparse.ArgumentParser(description="Generate synthetic Lakehouse360 source data")
+    parser.add_argument("--engine", choices=["row", "columnar", "sharded"], default="row",
+                        help="row: one Faker record at a time; columnar: whole Arrow columns per batch; "
+                             "sharded: columnar part files generated in a process pool")
+    parser.add_argument("--scale", type=float, default=1.0, help="Row-count multiplier (sharded engine)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (sharded engine)")
+    args = parser.parse_args()
+
+    if args.engine == "sharded":
+        from ingestion.sharded import generate_sharded
+        generate_sharded(TABLES, output_dir, seed=100, scale=args.scale, workers=args.workers)
+    elif args.engine == "columnar":
+        from ingestion.columnar import write_table
+        for table in TABLES:
+            write_table(table, output_dir, seed=100)
+    else:
+        generate_customers()
+        generate_orders()
+        generate_inventory()
+        generate_deliveries()
+        generate_feedback()
     print("✅ All synthetic data files generated in ./data/")
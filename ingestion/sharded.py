@@ -0,0 +1,51 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from ingestion.columnar import DEFAULT_ROWS, TABLE_FILES, generate_batches, write_batches
+
+# Sharded generation: each table is split into fixed-size shards whose seeds are
+# derived from (seed, table, shard). Shard boundaries depend only on the row
+# count and SHARD_ROWS, never on the number of workers, so the part files are
+# byte-identical whether they are produced by 1 or 64 processes.
+
+SHARD_ROWS = 1_000_000
+
+
+def plan_shards(table_name: str, scale: float = 1.0, shard_rows: int = SHARD_ROWS) -> list:
+    total = int(DEFAULT_ROWS[table_name] * scale)
+    num_shards = max(1, math.ceil(total / shard_rows))
+    return [(shard, min(shard_rows, total - shard * shard_rows)) for shard in range(num_shards)]
+
+
+def shard_path(output_dir, table_name: str, shard: int) -> Path:
+    suffix = Path(TABLE_FILES[table_name][0]).suffix
+    return Path(output_dir) / table_name / f"part-{shard:05d}{suffix}"
+
+
+def write_shard(table_name: str, shard: int, n: int, seed: int, output_dir, now: datetime) -> Path:
+    _, fmt = TABLE_FILES[table_name]
+    output_path = shard_path(output_dir, table_name, shard)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_batches(generate_batches(table_name, n, seed, now, shard=shard), output_path, fmt)
+    return output_path
+
+
+def generate_sharded(tables: list, output_dir, seed: int, scale: float = 1.0, workers: int = None,
+                     shard_rows: int = SHARD_ROWS, now: datetime = None) -> list:
+    # One timestamp for the whole run so every shard shares the same date ranges
+    now = (now or datetime.now()).replace(microsecond=0)
+    jobs = [
+        (table, shard, n)
+        for table in tables
+        for shard, n in plan_shards(table, scale, shard_rows)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_shard, table, shard, n, seed, output_dir, now)
+            for table, shard, n in jobs
+        ]
+        paths = [future.result() for future in futures]
+    print(f"✅ Wrote {len(paths)} part files for {len(tables)} tables (scale={scale})")
+    return paths
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from streamlit_app.queries import quote, where_clause
+
+# Chart data computed in DuckDB over the whole filtered table: grouped counts,
+# fixed-width histograms and time-bucketed series. Only a few hundred points reach
+# Plotly; long time series are reduced with Largest-Triangle-Three-Buckets, which
+# keeps the visual peaks and troughs of the series.
+
+TOP_CATEGORIES = 12
+HISTOGRAM_BINS = 40
+MAX_TIME_BUCKETS = 5000
+MAX_POINTS = 500
+
+NUMERIC_TYPES = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT",
+                 "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE", "REAL", "DECIMAL")
+TEMPORAL_TYPES = ("DATE", "TIMESTAMP")
+CATEGORICAL_TYPES = ("VARCHAR", "BOOLEAN", "ENUM")
+
+# Candidate bucket widths for time series, finest first
+TIME_BUCKETS = ["1 minute", "1 hour", "1 day", "1 week", "1 month", "1 year"]
+BUCKET_SECONDS = {"1 minute": 60, "1 hour": 3600, "1 day": 86400, "1 week": 604800,
+                  "1 month": 2629800, "1 year": 31557600}
+
+
+def column_types(con, table: str) -> dict:
+    return {name: col_type for name, col_type, *_ in con.execute(f"DESCRIBE {quote(table)}").fetchall()}
+
+
+def columns_of_kind(types: dict, kinds: tuple) -> list:
+    return [name for name, col_type in types.items() if col_type.startswith(kinds)]
+
+
+def grouped_counts_query(table: str, column: str, filters: dict, top: int = TOP_CATEGORIES):
+    # Most frequent values of column, with the remaining ones folded into "Other"
+    where, params = where_clause(filters)
+    col = quote(column)
+    return f"""
+        WITH counts AS (
+            SELECT CAST({col} AS VARCHAR) AS value, COUNT(*) AS count
+            FROM {quote(table)} {where} GROUP BY {col}
+        ), ranked AS (
+            SELECT *, row_number() OVER (ORDER BY count DESC, value) AS rank FROM counts
+        )
+        SELECT CASE WHEN rank <= {int(top)} THEN value ELSE 'Other' END AS {col}, CAST(SUM(count) AS BIGINT) AS count
+        FROM ranked GROUP BY 1 ORDER BY MIN(rank)
+    """, params
+
+
+def not_null_clause(where: str, expr: str) -> str:
+    return f"{where} AND {expr} IS NOT NULL" if where else f"WHERE {expr} IS NOT NULL"
+
+
+def histogram_query(table: str, column: str, filters: dict, bins: int = HISTOGRAM_BINS):
+    # Fixed-width bins over [min, max] of the filtered column: bin start, bin end, count
+    where, params = where_clause(filters)
+    col = quote(column)
+    return f"""
+        WITH data AS (SELECT CAST({col} AS DOUBLE) AS x FROM {quote(table)} {not_null_clause(where, col)}),
+        bounds AS (SELECT MIN(x) AS lo, GREATEST(MAX(x) - MIN(x), 1e-9) / {int(bins)} AS width FROM data)
+        SELECT lo + bin * width AS bin_start, lo + (bin + 1) * width AS bin_end, COUNT(*) AS count
+        FROM (SELECT LEAST(CAST(floor((x - lo) / width) AS BIGINT), {int(bins) - 1}) AS bin, lo, width
+              FROM data, bounds)
+        GROUP BY bin, lo, width ORDER BY bin
+    """, params
+
+
+def time_span_query(table: str, column: str, filters: dict):
+    # Seconds between the first and last timestamp of the filtered column
+    where, params = where_clause(filters)
+    ts = f"CAST({quote(column)} AS TIMESTAMP)"
+    return f"SELECT epoch(MAX({ts})) - epoch(MIN({ts})) AS span FROM {quote(table)} {where}", params
+
+
+def pick_time_bucket(span_seconds) -> str:
+    # Finest bucket width that keeps the series under MAX_TIME_BUCKETS points
+    for bucket in TIME_BUCKETS:
+        if (span_seconds or 0) / BUCKET_SECONDS[bucket] <= MAX_TIME_BUCKETS:
+            return bucket
+    return TIME_BUCKETS[-1]
+
+
+def time_series_query(table: str, time_column: str, filters: dict, bucket: str, value_column: str = None):
+    # Row count, or the mean of value_column, per time bucket
+    if bucket not in BUCKET_SECONDS:
+        raise ValueError(f"Unknown time bucket: {bucket}")
+    where, params = where_clause(filters)
+    ts = f"CAST({quote(time_column)} AS TIMESTAMP)"
+    value = f"AVG(CAST({quote(value_column)} AS DOUBLE))" if value_column else "COUNT(*)"
+    return f"""
+        SELECT time_bucket(INTERVAL '{bucket}', {ts}) AS bucket, {value} AS value
+        FROM {quote(table)} {not_null_clause(where, ts)}
+        GROUP BY bucket ORDER BY bucket
+    """, params
+
+
+def downsample(df: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    # Reduce a (bucket, value) series to at most max_points with LTTB
+    df = df.dropna(subset=["value"]).reset_index(drop=True)
+    if len(df) <= max_points:
+        return df
+    x = df["bucket"].astype("int64").to_numpy(dtype=float)
+    keep = lttb(x, df["value"].to_numpy(dtype=float), max_points)
+    return df.iloc[keep].reset_index(drop=True)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: indices of threshold points that best preserve the shape of (x, y)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = [0]
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        a = selected[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        selected.append(start + int(np.argmax(area)))
+    selected.append(n - 1)
+    return np.array(selected)
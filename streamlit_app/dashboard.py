@@ -1,144 +1,206 @@
 import os
+import json
 import duckdb
-import pandas as pd
 import streamlit as st
-from fpdf import FPDF
-from io import BytesIO
 from pathlib import Path
 import plotly.express as px
+from analysis.query_cache import QueryCache
+from transform.partitioning import parquet_files, with_partition_filters
+from streamlit_app.value_index import MAX_OPTIONS, load_value_index
+from streamlit_app.exports import EXPORT_FORMATS, export
+from streamlit_app.reports import TEMPLATES, ReportService, report_key
+from streamlit_app.queries import (connect, table_columns, run, summary_query,
+                                   page_query, split_page, filtered_query)
+from streamlit_app.charts import (NUMERIC_TYPES, CATEGORICAL_TYPES, TEMPORAL_TYPES, column_types, columns_of_kind,
+                                  grouped_counts_query, histogram_query, time_span_query, pick_time_bucket,
+                                  time_series_query, downsample)
 
 # ────────────── CONSTANTS ──────────────
 PROJECT_NAME = "Lakehouse360 Dashboard"
 PROJECT_DESCRIPTION = "Explore, filter, and export insights from Lakehouse360 datasets."
 CREATOR_NAME = "Built by Ojas Shukla"
 DATA_PATH = Path("output/cleaned_parquet")
+PAGE_SIZES = [50, 100, 250, 500]
 
 # ────────────── LOAD DATA ──────────────
 @st.cache_resource
 def load_data():
-    con = duckdb.connect()
-    tables = {}
-    for file in DATA_PATH.glob("*.parquet"):
-        name = file.stem
-        df = pd.read_parquet(file)
-        con.register(name, df)
-        tables[name] = df
-    return tables, con
-
-tables, con = load_data()
-table_names = list(tables.keys())
+    # Views over the Parquet files (single files and hive-partitioned directories); nothing is loaded up front
+    con = connect(DATA_PATH)
+    table_names = [row[0] for row in con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()]
+    return sorted(table_names), con
+
+table_names, con = load_data()
+
+# Result cache shared with analysis/duckdb_analytics.py (output/query_cache)
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(root=DATA_PATH)
+
+query_cache = get_query_cache()
 
 # ────────────── SIDEBAR ──────────────
 st.sidebar.title("🔎 Filters")
 selected_table = st.sidebar.selectbox("Select Table", table_names)
-df = tables[selected_table]
-filter_cols = st.sidebar.multiselect("Columns to Filter", df.columns.tolist())
+columns = table_columns(con.cursor(), selected_table)
+filter_cols = st.sidebar.multiselect("Columns to Filter", columns)
+
+# Distinct-value index per (table, column), rebuilt only when the table's Parquet files change
+@st.cache_resource(max_entries=64)
+def get_value_index(table, column, fingerprint):
+    return load_value_index(con.cursor(), table, column, DATA_PATH)
 
 filter_values = {}
+unique_values = {}
 for col in filter_cols:
-    unique_vals = df[col].dropna().unique().tolist()
-    default_vals = unique_vals[:20]  # limit defaults to first 20 for speed
-    filter_values[col] = st.sidebar.multiselect(f"{col}", unique_vals, default=default_vals)
+    value_index = get_value_index(selected_table, col, json.dumps(parquet_files(selected_table, DATA_PATH)))
+    if value_index.cardinality <= MAX_OPTIONS:
+        unique_vals = value_index.options()  # most frequent first
+        unique_values[col] = unique_vals
+        default_vals = unique_vals[:20]  # limit defaults to first 20 for speed
+        filter_values[col] = st.sidebar.multiselect(f"{col}", unique_vals, default=default_vals)
+    else:
+        # Too many values for a list: prefix search, and no filter until something is picked
+        widget_key = f"filter_{selected_table}_{col}"
+        prefix = st.sidebar.text_input(f"Search {col} ({value_index.cardinality:,} values)", key=f"search_{widget_key}")
+        selected = st.session_state.get(widget_key, [])
+        matches = value_index.prefix_search(prefix) if prefix else [v for v, _ in value_index.top_values()]
+        picked = st.sidebar.multiselect(f"{col}", list(dict.fromkeys(selected + matches)), key=widget_key)
+        if picked:
+            filter_values[col] = picked
+
+page_size = st.sidebar.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(100))
 
 # ────────────── FILTER DATA ──────────────
-df_filtered = df.copy()
-for col, vals in filter_values.items():
-    df_filtered = df_filtered[df_filtered[col].isin(vals)]
+# Filters become a parameterized DuckDB query; only the summary and the displayed page are fetched
+# A filter on order_timestamp / return_date also selects the matching month partitions
+query_filters = with_partition_filters(selected_table, filter_values, DATA_PATH)
+summary = run(con, summary_query(selected_table, columns, query_filters), query_cache).iloc[0]
+
+# Keyset pagination: keep the last key of every visited page, restart when the table or filters change
+view_key = (selected_table, repr(filter_values), page_size)
+if st.session_state.get("page_view") != view_key:
+    st.session_state.page_view = view_key
+    st.session_state.page_cursors = [None]
+page_number = len(st.session_state.page_cursors) - 1
+df_page, next_cursor = split_page(
+    run(con, page_query(selected_table, DATA_PATH, columns, query_filters,
+                        st.session_state.page_cursors[-1], page_size), query_cache),
+    page_size)
+
+cache_stats = query_cache.stats()
+st.sidebar.caption(f"⚡ Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                   f"{cache_stats['entries']} results ({cache_stats['bytes'] / 1024:.0f} KB)")
 
 # ────────────── PAGE HEADER ──────────────
 st.title(PROJECT_NAME)
 st.caption(PROJECT_DESCRIPTION)
 st.subheader(f"📄 Table: `{selected_table}`")
-st.info("⚠️ Showing only the first 100 rows for performance. Use export to get full data.")
 
 # ────────────── SUMMARY ──────────────
 col1, col2, col3 = st.columns(3)
-col1.metric("Filtered Rows", len(df_filtered))
-col2.metric("Columns", len(df_filtered.columns))
-col3.metric("Missing Values", df_filtered.isnull().sum().sum())
+col1.metric("Filtered Rows", int(summary["row_count"]))
+col2.metric("Columns", len(columns))
+col3.metric("Missing Values", int(summary["missing_values"]))
 
 st.divider()
-st.dataframe(df_filtered.head(100))
+st.dataframe(df_page)
+
+def next_page(cursor):
+    st.session_state.page_cursors.append(cursor)
+
+def previous_page():
+    if len(st.session_state.page_cursors) > 1:
+        st.session_state.page_cursors.pop()
+
+def first_page():
+    st.session_state.page_cursors = [None]
+
+first_row = page_number * page_size
+nav1, nav2, nav3, nav4 = st.columns([1, 1, 1, 3])
+nav1.button("⏮️ First", on_click=first_page, disabled=page_number == 0)
+nav2.button("⬅️ Previous", on_click=previous_page, disabled=page_number == 0)
+nav3.button("Next ➡️", on_click=next_page, args=(next_cursor,), disabled=next_cursor is None)
+nav4.caption(f"Page {page_number + 1} · rows {first_row + min(1, len(df_page)):,}–{first_row + len(df_page):,} "
+             f"of {int(summary['row_count']):,}")
 
 # ────────────── VISUALIZATIONS ──────────────
 st.subheader("📊 Visualizations")
-numeric_cols = df_filtered.select_dtypes("number").columns
-cat_cols = df_filtered.select_dtypes(["object", "category", "bool"]).columns
+# Chart data is aggregated in DuckDB over all filtered rows; only bins, groups and buckets reach Plotly
+column_kinds = column_types(con.cursor(), selected_table)
+numeric_cols = columns_of_kind(column_kinds, NUMERIC_TYPES)
+cat_cols = columns_of_kind(column_kinds, CATEGORICAL_TYPES)
+time_cols = columns_of_kind(column_kinds, TEMPORAL_TYPES)
 
 if len(numeric_cols) >= 1:
-    st.markdown("#### 📊 Bar Chart (numeric)")
-    y_axis = st.selectbox("Y-axis", numeric_cols, key="bar_y")
-    fig_bar = px.bar(df_filtered.head(100), y=y_axis)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    st.markdown("#### 📊 Histogram (numeric)")
+    x_axis = st.selectbox("Column", numeric_cols, key="hist_x")
+    hist_df = run(con, histogram_query(selected_table, x_axis, query_filters), query_cache)
+    hist_df["bin"] = (hist_df["bin_start"] + hist_df["bin_end"]) / 2
+    fig_hist = px.bar(hist_df, x="bin", y="count", hover_data=["bin_start", "bin_end"], labels={"bin": x_axis})
+    fig_hist.update_layout(bargap=0)
+    st.plotly_chart(fig_hist, use_container_width=True)
 
 if len(cat_cols) >= 1:
     st.markdown("#### 🥧 Pie Chart (categorical)")
     cat_axis = st.selectbox("Category", cat_cols, key="pie_cat")
-    pie_df = df_filtered[cat_axis].value_counts().reset_index()
-    pie_df.columns = [cat_axis, "count"]
+    pie_df = run(con, grouped_counts_query(selected_table, cat_axis, query_filters), query_cache)
     fig_pie = px.pie(pie_df, names=cat_axis, values="count")
     st.plotly_chart(fig_pie, use_container_width=True)
 
+if len(time_cols) >= 1:
+    st.markdown("#### 📈 Time Series")
+    ts1, ts2 = st.columns(2)
+    time_axis = ts1.selectbox("Time column", time_cols, key="ts_time")
+    value_axis = ts2.selectbox("Value", ["Row count"] + numeric_cols, key="ts_value")
+    span = run(con, time_span_query(selected_table, time_axis, query_filters), query_cache)["span"].iloc[0]
+    bucket = pick_time_bucket(span)
+    ts_df = downsample(run(con, time_series_query(selected_table, time_axis, query_filters, bucket,
+                                                  None if value_axis == "Row count" else value_axis), query_cache))
+    fig_ts = px.line(ts_df, x="bucket", y="value", labels={"bucket": time_axis, "value": value_axis})
+    st.plotly_chart(fig_ts, use_container_width=True)
+    st.caption(f"Bucketed by {bucket} · {len(ts_df):,} points")
+
 # ────────────── EXPORT SECTION ──────────────
+# Exports are only produced when requested: DuckDB COPY (or a streaming Excel writer) to a temp file
 st.subheader("📤 Export Options")
-
-# CSV
-st.download_button(
-    "⬇️ CSV Export",
-    df_filtered.to_csv(index=False),
-    f"{selected_table}_filtered.csv",
-    "text/csv"
-)
-
-# JSON
-st.download_button(
-    "⬇️ JSON Export",
-    df_filtered.to_json(orient="records", indent=2).encode("utf-8"),
-    f"{selected_table}_filtered.json",
-    "application/json"
-)
-
-# Excel
-excel_buffer = BytesIO()
-with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-    df_filtered.to_excel(writer, index=False, sheet_name="Filtered Data")
-excel_buffer.seek(0)
-st.download_button(
-    "⬇️ Excel Export",
-    excel_buffer.getvalue(),
-    f"{selected_table}_filtered.xlsx",
-    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
-
-# PDF
-def generate_pdf(df, title, table_name, applied_filters):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, title, ln=True, align="C")
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, f"Table: {table_name}", ln=True)
-    pdf.set_font("Arial", "", 11)
-    pdf.cell(0, 10, f"Rows: {len(df)} | Columns: {len(df.columns)}", ln=True)
-
-    if applied_filters:
-        pdf.multi_cell(0, 10, f"Filters Applied:\n" + "\n".join([f"{k}: {v}" for k, v in applied_filters.items()]))
-
-    pdf.ln(4)
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "Top 10 Records:", ln=True)
-    pdf.set_font("Arial", "", 9)
-    for idx, row in df.head(10).iterrows():
-        row_str = " | ".join(str(x) for x in row.values[:5])
-        pdf.cell(0, 10, row_str[:100], ln=True)
-
-    pdf.ln(10)
-    pdf.set_font("Arial", "I", 10)
-    pdf.cell(0, 10, CREATOR_NAME, ln=True, align="C")
-
-    return pdf.output(dest="S").encode("latin-1", "ignore")
-
-applied_filters_summary = {k: v for k, v in filter_values.items() if v != df[k].unique().tolist()}
-pdf_bytes = generate_pdf(df_filtered, "Lakehouse360 Report", selected_table, applied_filters_summary)
-st.download_button("⬇️ PDF Export", pdf_bytes, f"{selected_table}_report.pdf", "application/pdf")
+export_query = filtered_query(selected_table, query_filters)
+export_key = query_cache.key(*export_query)
+
+fmt_col, prepare_col = st.columns([2, 1])
+export_format = fmt_col.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+if prepare_col.button("🛠️ Prepare export"):
+    with st.spinner(f"Writing {export_format} export..."):
+        st.session_state.export_file = (export_key, export_format,
+                                        export(con, export_query, export_format, export_key))
+
+prepared = st.session_state.get("export_file")
+if prepared and prepared[:2] == (export_key, export_format):
+    extension, mime, _ = EXPORT_FORMATS[export_format]
+    with open(prepared[2], "rb") as export_file:
+        st.download_button(f"⬇️ {export_format} Export", export_file, f"{selected_table}_filtered{extension}", mime)
+
+# PDF reports render in a background worker pool and are cached by (table files, filters, template)
+@st.cache_resource
+def get_report_service():
+    return ReportService(DATA_PATH)
+
+report_service = get_report_service()
+template_col, report_col = st.columns([2, 1])
+report_template = template_col.selectbox("PDF template", list(TEMPLATES), format_func=lambda t: TEMPLATES[t][0],
+                                         key="report_template")
+if report_col.button("🛠️ Prepare PDF report"):
+    applied_filters_summary = {k: v for k, v in filter_values.items() if v != unique_values.get(k)}
+    st.session_state.pdf_report = report_service.submit(selected_table, query_filters, report_template,
+                                                        applied_filters=applied_filters_summary, footer=CREATOR_NAME)
+pdf_key = st.session_state.get("pdf_report")
+if pdf_key and pdf_key == report_key(selected_table, query_filters, report_template, DATA_PATH):
+    report_status = report_service.status(pdf_key)
+    if report_status == "ready":
+        with open(report_service.path(pdf_key), "rb") as report_file:
+            st.download_button("⬇️ PDF Export", report_file, f"{selected_table}_report.pdf", "application/pdf")
+    elif report_status == "running":
+        st.info("⏳ Rendering PDF report in the background...")
+        st.button("🔄 Check report status")
+    else:
+        st.error(f"❌ PDF report {report_status}")
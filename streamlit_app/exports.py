@@ -0,0 +1,72 @@
+import os
+import time
+import tempfile
+from pathlib import Path
+
+# Lazy exports for the dashboard: nothing is serialized until an export is
+# requested. CSV / JSON / JSONL / Parquet are written by DuckDB COPY straight
+# from the filtered query to a temp file; Excel streams record batches into an
+# openpyxl write-only workbook, so memory stays constant whatever the row count.
+# Files are named after the query-cache key (SQL, parameters and input file
+# fingerprints), so repeating an export reuses the finished file.
+
+EXPORT_DIR = Path(tempfile.gettempdir()) / "lakehouse360_exports"
+EXCEL_BATCH_ROWS = 10_000
+EXCEL_MAX_ROWS = 1_048_575  # sheet limit minus the header row
+EXPORT_MAX_AGE_SECONDS = 6 * 3600
+
+# Format -> (extension, MIME type, DuckDB COPY options or None for Excel)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv", "FORMAT CSV, HEADER"),
+    "JSON": (".json", "application/json", "FORMAT JSON, ARRAY true"),
+    "JSONL": (".jsonl", "application/x-ndjson", "FORMAT JSON"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", "FORMAT PARQUET"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", None),
+}
+
+
+def write_excel(con, sql: str, params: list, path: Path, sheet_name: str = "Filtered Data"):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    reader = con.execute(sql, params).to_arrow_reader(EXCEL_BATCH_ROWS)
+    sheet.append(reader.schema.names)
+    written = 0
+    for batch in reader:
+        rows = batch.slice(0, EXCEL_MAX_ROWS - written)
+        for row in zip(*(column.to_pylist() for column in rows.columns)):
+            sheet.append(row)
+        written += rows.num_rows
+        if written >= EXCEL_MAX_ROWS:
+            break
+    workbook.save(path)
+
+
+def prune_exports(max_age: float = EXPORT_MAX_AGE_SECONDS):
+    cutoff = time.time() - max_age
+    for path in EXPORT_DIR.glob("*"):
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+
+def export(con, query, fmt: str, cache_key: str) -> Path:
+    # Write the result of (sql, params) in the given format once; later calls return the same file
+    sql, params = query
+    extension, _, copy_options = EXPORT_FORMATS[fmt]
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    prune_exports()
+    path = EXPORT_DIR / f"{cache_key}{extension}"
+    if path.exists():
+        return path
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{extension}")
+    cursor = con.cursor()
+    try:
+        if copy_options is None:
+            write_excel(cursor, sql, params, tmp_path)
+        else:
+            cursor.execute(f"COPY ({sql}) TO '{tmp_path.as_posix()}' ({copy_options})", params)
+    finally:
+        cursor.close()
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,90 @@
+import duckdb
+from pathlib import Path
+from transform.keys import PRIMARY_KEYS
+from transform.partitioning import list_tables, parquet_source
+
+# SQL for the dashboard: every widget state becomes a parameterized DuckDB query
+# over the Parquet views, and only the rows or numbers on screen are fetched.
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def connect(root: Path) -> duckdb.DuckDBPyConnection:
+    # In-memory connection with one view per cleaned table (single file or partitioned directory)
+    con = duckdb.connect()
+    for table in list_tables(root):
+        con.execute(f"CREATE VIEW {quote(table)} AS SELECT * FROM {parquet_source(table, root)}")
+    return con
+
+
+def table_columns(con, table: str) -> list:
+    return [row[0] for row in con.execute(f"DESCRIBE {quote(table)}").fetchall()]
+
+
+def where_clause(filters: dict):
+    # {column: [values]} -> ("WHERE ...", params); an empty selection matches no rows, like isin([])
+    conditions, params = [], []
+    for column, values in filters.items():
+        if not values:
+            conditions.append("FALSE")
+            continue
+        conditions.append(f"{quote(column)} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+    return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def summary_query(table: str, columns: list, filters: dict):
+    # Row count and total missing values of the filtered table in one scan
+    where, params = where_clause(filters)
+    missing = " + ".join(f"(COUNT(*) - COUNT({quote(col)}))" for col in columns) or "0"
+    return f"SELECT COUNT(*) AS row_count, {missing} AS missing_values FROM {quote(table)} {where}", params
+
+
+def filtered_query(table: str, filters: dict):
+    where, params = where_clause(filters)
+    return f"SELECT * FROM {quote(table)} {where}", params
+
+
+def page_key(table: str, columns: list) -> list:
+    # Keyset columns: the declared primary key, made unique by the row's file position
+    pk = PRIMARY_KEYS.get(table)
+    return ([quote(pk)] if pk in columns else []) + ["filename", "file_row_number"]
+
+
+def page_query(table: str, root: Path, columns: list, filters: dict, after: list = None, page_size: int = 100):
+    # One page in key order, starting after the previous page's last key. Reads the Parquet
+    # directly (for its filename/file_row_number columns); fetches page_size + 1 rows to
+    # tell whether a next page exists.
+    where, params = where_clause(filters)
+    key = page_key(table, columns)
+    key_tuple = f"({', '.join(key)})"
+    if after is not None:
+        where = f"{where} AND {key_tuple} > ({', '.join('?' for _ in key)})" if where \
+            else f"WHERE {key_tuple} > ({', '.join('?' for _ in key)})"
+        params = params + list(after)
+    select = ", ".join([quote(col) for col in columns] + [f"{expr} AS _key{i}" for i, expr in enumerate(key)])
+    return (f"SELECT {select} FROM {parquet_source(table, root)} {where} "
+            f"ORDER BY {key_tuple} LIMIT {int(page_size) + 1}", params)
+
+
+def split_page(df, page_size: int):
+    # (rows to display, cursor for the next page or None)
+    key_cols = [col for col in df.columns if col.startswith("_key")]
+    has_next = len(df) > page_size
+    page = df.head(page_size)
+    cursor = [v.item() if hasattr(v, "item") else v for v in page[key_cols].iloc[-1]] if has_next else None
+    return page.drop(columns=key_cols), cursor
+
+
+def run(con, query, cache=None):
+    # DataFrame for (sql, params) on a fresh cursor, through the shared result cache when given
+    sql, params = query
+    cursor = con.cursor()
+    try:
+        if cache is not None:
+            return cache.df(cursor, sql, params)
+        return cursor.execute(sql, params).df()
+    finally:
+        cursor.close()
@@ -1,23 +1,85 @@
 from fpdf import FPDF
 from io import BytesIO
 
+# Row height and font size for table pages; long cells are truncated to the column width
+ROW_HEIGHT = 6
+TABLE_FONT_SIZE = 7
+HEADER_FONT_SIZE = 8
+
+
+def pdf_text(value) -> str:
+    # Core PDF fonts are latin-1 only
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
 class PDF(FPDF):
+    # Printed in the header of every page
+    report_title = "Lakehouse360 Report"
+
     def header(self):
         self.set_font("Arial", "B", 16)
-        self.cell(0, 10, "Lakehouse360 Report", ln=True, align="C")
+        self.cell(0, 10, pdf_text(self.report_title), ln=True, align="C")
         self.ln(10)
 
+    def footer(self):
+        self.set_y(-12)
+        self.set_font("Arial", "I", 8)
+        self.cell(0, 8, f"Page {self.page_no()}", align="C")
+
+    def fit_text(self, value, width: float) -> str:
+        text = pdf_text(value)
+        if self.get_string_width(text) <= width - 2:
+            return text
+        while text and self.get_string_width(text + "...") > width - 2:
+            text = text[:-1]
+        return text + "..."
+
+    def table_header(self, columns, col_width: float):
+        self.set_font("Arial", "B", HEADER_FONT_SIZE)
+        for col in columns:
+            self.cell(col_width, ROW_HEIGHT + 1, self.fit_text(col, col_width), border=1)
+        self.ln()
+        self.set_font("Arial", "", TABLE_FONT_SIZE)
+
+    def add_rows(self, columns, chunks):
+        # Render row chunks (lists of row tuples); the header is repeated on every new page
+        col_width = (self.w - self.l_margin - self.r_margin) / max(len(columns), 1)
+        self.table_header(columns, col_width)
+        for rows in chunks:
+            for row in rows:
+                if self.get_y() + ROW_HEIGHT > self.page_break_trigger:
+                    self.add_page()
+                    self.table_header(columns, col_width)
+                for item in row:
+                    self.cell(col_width, ROW_HEIGHT, self.fit_text("" if item is None else item, col_width), border=1)
+                self.ln()
+
     def add_table(self, df):
+        self.add_rows(list(df.columns), [df.itertuples(index=False, name=None)])
+
+    def add_bar_chart(self, title: str, labels: list, values: list, height: float = 60):
+        # Horizontal bar chart drawn with PDF primitives (one bar per label)
+        if self.get_y() + height + 14 > self.page_break_trigger:
+            self.add_page()
         self.set_font("Arial", "B", 10)
-        col_width = self.w / (len(df.columns) + 1)
-        for col in df.columns:
-            self.cell(col_width, 8, str(col), border=1)
-        self.ln()
-        self.set_font("Arial", "", 9)
-        for i, row in df.iterrows():
-            for item in row:
-                self.cell(col_width, 8, str(item), border=1)
-            self.ln()
+        self.cell(0, 8, pdf_text(title), ln=True)
+        self.set_font("Arial", "", 7)
+        label_width = 45
+        chart_width = self.w - self.l_margin - self.r_margin - label_width - 20
+        bar_height = height / max(len(values), 1)
+        peak = max(values, default=0) or 1
+        top = self.get_y()
+        for i, (label, value) in enumerate(zip(labels, values)):
+            y = top + i * bar_height
+            self.set_xy(self.l_margin, y)
+            self.cell(label_width, bar_height, self.fit_text(label, label_width), align="R")
+            self.set_fill_color(70, 130, 180)
+            self.rect(self.l_margin + label_width, y + bar_height * 0.15,
+                      max(chart_width * value / peak, 0.2), bar_height * 0.7, style="F")
+            self.set_xy(self.l_margin + label_width + chart_width * value / peak + 1, y)
+            self.cell(18, bar_height, pdf_text(f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"))
+        self.set_xy(self.l_margin, top + height + 4)
+
 
 def generate_pdf_report(df, title="Data Report"):
     pdf = PDF()
@@ -0,0 +1,160 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from transform.partitioning import parquet_files
+from streamlit_app.queries import connect, filtered_query, quote
+from streamlit_app.charts import (NUMERIC_TYPES, CATEGORICAL_TYPES, column_types, columns_of_kind,
+                                  histogram_query, grouped_counts_query)
+
+# Background PDF reports for the dashboard. A report is rendered by a worker process
+# with its own DuckDB connection, so a large report never blocks the Streamlit script.
+# Finished PDFs are cached as <REPORT_DIR>/<key>.pdf where the key hashes the template,
+# the table, the filter set and the fingerprints of the table's Parquet files; the same
+# request is served from disk, and a changed table produces a new report. Table pages
+# are rendered from DuckDB record batches, one chunk at a time.
+
+REPORT_DIR = Path(tempfile.gettempdir()) / "lakehouse360_reports"
+REPORT_WORKERS = 2
+CHUNK_ROWS = 2_000
+MAX_CHART_COLUMNS = 4
+
+# Template -> (description, maximum rows in the data table, include profiles and charts)
+TEMPLATES = {
+    "summary": ("Summary and first 10 rows", 10, False),
+    "full": ("Column profiles, charts and the filtered table", 20_000, True),
+}
+
+
+def report_key(table: str, filters: dict, template: str, root: Path) -> str:
+    fingerprint = {
+        "template": template,
+        "table": table,
+        "filters": {col: [str(v) for v in values] for col, values in sorted(filters.items())},
+        "files": parquet_files(table, root),
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+
+def add_overview(pdf, table: str, row_count: int, column_count: int, applied_filters: dict, footer: str):
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, f"Table: {table}", ln=True)
+    pdf.set_font("Arial", "", 11)
+    pdf.cell(0, 8, f"Rows: {row_count:,} | Columns: {column_count}", ln=True)
+    if applied_filters:
+        lines = [f"{col}: {', '.join(str(v) for v in values)}" for col, values in applied_filters.items()]
+        pdf.multi_cell(0, 7, "Filters Applied:\n" + "\n".join(lines)[:2000])
+    if footer:
+        pdf.set_font("Arial", "I", 10)
+        pdf.cell(0, 8, footer, ln=True)
+    pdf.ln(4)
+
+
+def add_profiles(pdf, con, query):
+    # One SUMMARIZE over the filtered rows: type, min, max, distinct and null share per column
+    sql, params = query
+    profile = con.execute(f"SUMMARIZE {sql}", params).fetch_arrow_table()
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Column Profiles", ln=True)
+    fields = ["column_name", "column_type", "min", "max", "approx_unique", "avg", "null_percentage"]
+    pdf.add_rows(["column", "type", "min", "max", "distinct", "mean", "null %"],
+                 [zip(*(profile.column(field).to_pylist() for field in fields))])
+    pdf.ln(6)
+
+
+def add_charts(pdf, con, table: str, filters: dict):
+    types = column_types(con, table)
+    for column in columns_of_kind(types, NUMERIC_TYPES)[:MAX_CHART_COLUMNS]:
+        sql, params = histogram_query(table, column, filters, bins=12)
+        bins = con.execute(sql, params).fetchall()
+        pdf.add_bar_chart(f"Distribution of {column}", [f"{lo:,.2f} - {hi:,.2f}" for lo, hi, _ in bins],
+                          [count for *_, count in bins])
+    for column in columns_of_kind(types, CATEGORICAL_TYPES)[:MAX_CHART_COLUMNS]:
+        sql, params = grouped_counts_query(table, column, filters, top=10)
+        groups = con.execute(sql, params).fetchall()
+        pdf.add_bar_chart(f"Top values of {column}", [value for value, _ in groups], [count for _, count in groups])
+
+
+def record_chunks(con, sql: str, params: list, chunk_rows: int = CHUNK_ROWS):
+    # Row tuples in chunks of chunk_rows, straight from DuckDB record batches
+    reader = con.execute(sql, params).to_arrow_reader(chunk_rows)
+    for batch in reader:
+        yield zip(*(column.to_pylist() for column in batch.columns))
+
+
+def render_report(root: str, table: str, filters: dict, template: str, path: str,
+                  title: str = "Lakehouse360 Report", applied_filters: dict = None, footer: str = ""):
+    # Worker entry point: render one report to path (written to a temp file, then renamed)
+    from streamlit_app.report_utils import PDF
+
+    _, max_rows, detailed = TEMPLATES[template]
+    con = connect(Path(root))
+    try:
+        sql, params = filtered_query(table, filters)
+        row_count = con.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+        columns = [row[0] for row in con.execute(f"DESCRIBE {quote(table)}").fetchall()]
+
+        pdf = PDF(orientation="L" if len(columns) > 6 else "P")
+        pdf.report_title = title
+        pdf.add_page()
+        add_overview(pdf, table, row_count, len(columns), applied_filters or {}, footer)
+        if detailed:
+            add_profiles(pdf, con, (sql, params))
+            add_charts(pdf, con, table, filters)
+            pdf.add_page()
+
+        shown = min(row_count, max_rows)
+        pdf.set_font("Arial", "B", 12)
+        heading = "Records" if shown == row_count else f"First {shown:,} of {row_count:,} Records"
+        pdf.cell(0, 10, heading, ln=True)
+        pdf.add_rows(columns, record_chunks(con, f"{sql} LIMIT {int(shown)}", params))
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pdf.output(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    finally:
+        con.close()
+
+
+class ReportService:
+    # Submits renders to a process pool; identical requests share one job and one cached file
+    def __init__(self, root: Path, report_dir: Path = REPORT_DIR, workers: int = REPORT_WORKERS):
+        self.root = Path(root)
+        self.report_dir = Path(report_dir)
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        return self.report_dir / f"{key}.pdf"
+
+    def submit(self, table: str, filters: dict, template: str = "full", **options) -> str:
+        key = report_key(table, filters, template, self.root)
+        with self.lock:
+            job = self.jobs.get(key)
+            if self.path(key).exists() or (job is not None and not job.done()):
+                return key
+            self.jobs[key] = self.pool.submit(render_report, str(self.root), table, filters, template,
+                                              str(self.path(key)), **options)
+        return key
+
+    def status(self, key: str) -> str:
+        # "ready", "running", "failed: <error>" or "missing"
+        if self.path(key).exists():
+            return "ready"
+        job = self.jobs.get(key)
+        if job is None:
+            return "missing"
+        if not job.done():
+            return "running"
+        error = job.exception()
+        return f"failed: {error}" if error else "missing"
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
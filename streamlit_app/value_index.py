@@ -0,0 +1,82 @@
+import json
+import bisect
+import pyarrow.parquet as pq
+from pathlib import Path
+from transform.partitioning import parquet_files
+from streamlit_app.queries import quote
+
+# Distinct-value index for the filter widgets. For each table column the dashboard
+# filters on, one GROUP BY writes every distinct value with its frequency, sorted by
+# its text form, to output/value_index/<table>.<column>.parquet. The index is rebuilt
+# only when the table's Parquet files change. Low-cardinality columns get their full
+# option list (most frequent first); high-cardinality columns are searched by prefix
+# with a binary search over the sorted text values.
+
+VALUE_INDEX_DIR = Path("output/value_index")
+TOP_K = 20
+MAX_OPTIONS = 1000
+
+
+class ValueIndex:
+    def __init__(self, table: str, column: str, values: list, texts: list, counts: list):
+        self.table = table
+        self.column = column
+        self.values = values
+        self.texts = texts
+        self.counts = counts
+        self.cardinality = len(values)
+
+    def top_values(self, k: int = TOP_K) -> list:
+        # [(value, count)] by descending frequency
+        order = sorted(range(self.cardinality), key=lambda i: (-self.counts[i], self.texts[i]))[:k]
+        return [(self.values[i], self.counts[i]) for i in order]
+
+    def options(self) -> list:
+        return [value for value, _ in self.top_values(self.cardinality)]
+
+    def prefix_search(self, prefix: str, limit: int = 50) -> list:
+        start = bisect.bisect_left(self.texts, prefix)
+        end = bisect.bisect_left(self.texts, prefix + "\U0010ffff", lo=start)
+        return self.values[start:min(end, start + limit)]
+
+
+def index_paths(table: str, column: str, index_dir: Path = VALUE_INDEX_DIR):
+    stem = f"{table}.{column}"
+    return index_dir / f"{stem}.parquet", index_dir / f"{stem}.json"
+
+
+def build_value_index(con, table: str, column: str, root: Path, index_dir: Path = VALUE_INDEX_DIR) -> ValueIndex:
+    data_path, meta_path = index_paths(table, column, index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    files = parquet_files(table, root)
+    col = quote(column)
+    con.execute(f"""
+        COPY (
+            SELECT {col} AS value, CAST({col} AS VARCHAR) AS text, COUNT(*) AS count
+            FROM {quote(table)} WHERE {col} IS NOT NULL
+            GROUP BY {col} ORDER BY text
+        ) TO '{data_path.as_posix()}' (FORMAT PARQUET)
+    """)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"table": table, "column": column, "files": files}, f)
+    return read_value_index(table, column, index_dir)
+
+
+def read_value_index(table: str, column: str, index_dir: Path = VALUE_INDEX_DIR) -> ValueIndex:
+    data = pq.read_table(index_paths(table, column, index_dir)[0])
+    return ValueIndex(table, column, data.column("value").to_pylist(),
+                      data.column("text").to_pylist(), data.column("count").to_pylist())
+
+
+def is_fresh(table: str, column: str, root: Path, index_dir: Path = VALUE_INDEX_DIR) -> bool:
+    data_path, meta_path = index_paths(table, column, index_dir)
+    if not (data_path.exists() and meta_path.exists()):
+        return False
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)["files"] == parquet_files(table, root)
+
+
+def load_value_index(con, table: str, column: str, root: Path, index_dir: Path = VALUE_INDEX_DIR) -> ValueIndex:
+    if is_fresh(table, column, root, index_dir):
+        return read_value_index(table, column, index_dir)
+    return build_value_index(con, table, column, root, index_dir)
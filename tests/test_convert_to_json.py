@@ -0,0 +1,30 @@
+import duckdb
+from transform import convert_to_json
+
+CSV = """order_id,customer_id,order_date,order_timestamp,total_amount,quantity,is_gift,is_active,status
+1,c1,2025-01-03,"2025-01-03T10:02:05",19.99,2,true,True,shipped
+2,c2,2025-02-14,"2025-02-14T23:59:59",5.5,1,false,0,None
+3,c3,2025-03-01,"2025-03-01T00:00:00",120.0,10,true,false,delivered
+"""
+
+
+def json_types(con, path):
+    return con.execute(f"DESCRIBE SELECT * FROM read_json_auto('{path}')").fetchall()
+
+
+def test_ndjson_infers_same_types_as_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(convert_to_json, "OUTPUT_DIR", tmp_path)
+    source = tmp_path / "orders.csv"
+    source.write_text(CSV)
+
+    json_path = convert_to_json.convert_file_to_json(source)
+    ndjson_path = convert_to_json.convert_file_streaming(source, "ndjson")
+
+    con = duckdb.connect()
+    json_schema = json_types(con, json_path)
+    assert json_schema == json_types(con, ndjson_path)
+    types = {name: col_type for name, col_type, *_ in json_schema}
+    assert types["order_date"] == "DATE"
+    assert types["order_timestamp"] == "TIMESTAMP"
+    rows = "SELECT * FROM read_json_auto('{}') ORDER BY order_id"
+    assert con.execute(rows.format(json_path)).fetchall() == con.execute(rows.format(ndjson_path)).fetchall()
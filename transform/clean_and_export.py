@@ -1,13 +1,24 @@
 import os
 import json
+import time
+import argparse
 import duckdb
 import pandas as pd
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from transform.manifest import Manifest
+from transform.partitioning import PARTITION_SPECS, clear_table_output, partitioned_copy_sql, table_path
+from transform.write_profiles import (
+    WRITE_PROFILES, duckdb_copy_options, pyarrow_write_kwargs, resolve_profile, sorted_query
+)
 
 # Paths
 JSON_DIR = Path("data/json_files")
 PARQUET_DIR = Path("output/cleaned_parquet")
 PARQUET_DIR.mkdir(parents=True, exist_ok=True)
+# Code the cleaned output depends on (this module holds the cleaning rules); a change to
+# any of them invalidates the manifest entries
+CODE_INPUTS = [Path(__file__), Path(__file__).with_name("partitioning.py"), Path(__file__).with_name("write_profiles.py")]
 
 # UUID fields per table
 UUID_COLUMNS = {
@@ -22,6 +33,73 @@ UUID_COLUMNS = {
     "employees": ["employee_id"]
 }
 
+# Cleaning rules per table; {source} is a registered table or a DuckDB reader
+CLEAN_QUERIES = {
+    "customers": """
+        SELECT
+            customer_id,
+            TRIM(first_name) || ' ' || TRIM(last_name) AS name,
+            LOWER(email) AS email,
+            phone_number,
+            CAST(date_of_birth AS DATE) AS dob,
+            state, country, is_active
+        FROM {source}
+        WHERE customer_id IS NOT NULL
+    """,
+    "orders": """
+        SELECT
+            order_id, customer_id, product_id, product_name,
+            quantity, price_per_unit, currency,
+            status, payment_method, order_timestamp
+        FROM {source}
+        WHERE order_id IS NOT NULL AND product_id IS NOT NULL
+    """,
+    "inventory": """
+        SELECT
+            product_id, product_name, warehouse_id, stock_level, restock_date
+        FROM {source}
+        WHERE product_id IS NOT NULL
+    """,
+    "deliveries": """
+        SELECT
+            delivery_id, order_id, courier,
+            delivery_status, estimated_arrival, delivered_at
+        FROM {source}
+        WHERE order_id IS NOT NULL
+    """,
+    "feedback": """
+        SELECT
+            supplier_id, supplier_name, feedback_score, submitted_at
+        FROM {source}
+        WHERE supplier_id IS NOT NULL
+    """,
+    "suppliers": """
+        SELECT
+            supplier_id, supplier_name, country,
+            num_products_supplied
+        FROM {source}
+        WHERE supplier_id IS NOT NULL
+    """,
+    "products": """
+        SELECT
+            product_id, product_name, price, rating
+        FROM {source}
+        WHERE product_id IS NOT NULL AND price > 0
+    """,
+    "returns": """
+        SELECT
+            return_id, order_id, reason, refund_amount, return_date
+        FROM {source}
+        WHERE order_id IS NOT NULL
+    """,
+    "employees": """
+        SELECT
+            employee_id, full_name, role, salary
+        FROM {source}
+        WHERE employee_id IS NOT NULL
+    """,
+}
+
 # DuckDB connection
 con = duckdb.connect()
 
@@ -31,8 +109,12 @@ def cast_uuid_columns(df, uuid_cols):
             df[col] = df[col].astype(str)
     return df
 
-def clean_table(table_name: str):
+def clean_table(table_name: str, connection=None, partitioned: bool = False, write_profile: str = "default"):
     try:
+        if table_name not in CLEAN_QUERIES:
+            print(f"❌ No rules defined for {table_name}")
+            return
+
         # Load JSON
         json_path = JSON_DIR / f"{table_name}.json"
         with open(json_path, "r", encoding="utf-8") as f:
@@ -43,102 +125,169 @@ def clean_table(table_name: str):
         df = cast_uuid_columns(df, UUID_COLUMNS.get(table_name, []))
 
         # Register for DuckDB SQL
-        con.register(table_name, df)
+        connection = connection or con
+        connection.register(table_name, df)
 
         # Transformations
-        if table_name == "customers":
-            df_clean = con.execute(f"""
-                SELECT 
-                    customer_id,
-                    TRIM(first_name) || ' ' || TRIM(last_name) AS name,
-                    LOWER(email) AS email,
-                    phone_number,
-                    CAST(date_of_birth AS DATE) AS dob,
-                    state, country, is_active
-                FROM {table_name}
-                WHERE customer_id IS NOT NULL
-            """).df()
-
-        elif table_name == "orders":
-            df_clean = con.execute(f"""
-                SELECT 
-                    order_id, customer_id, product_id, product_name,
-                    quantity, price_per_unit, currency,
-                    status, payment_method, order_timestamp
-                FROM {table_name}
-                WHERE order_id IS NOT NULL AND product_id IS NOT NULL
-            """).df()
-
-        elif table_name == "inventory":
-            df_clean = con.execute(f"""
-                SELECT 
-                    product_id, product_name, warehouse_id, stock_level, restock_date
-                FROM {table_name}
-                WHERE product_id IS NOT NULL
-            """).df()
-
-        elif table_name == "deliveries":
-            df_clean = con.execute(f"""
-                SELECT 
-                    delivery_id, order_id, courier,
-                    delivery_status, estimated_arrival, delivered_at
-                FROM {table_name}
-                WHERE order_id IS NOT NULL
-            """).df()
-
-        elif table_name == "feedback":
-            df_clean = con.execute(f"""
-                SELECT 
-                    supplier_id, supplier_name, feedback_score, submitted_at
-                FROM {table_name}
-                WHERE supplier_id IS NOT NULL
-            """).df()
-
-        elif table_name == "suppliers":
-            df_clean = con.execute(f"""
-                SELECT 
-                    supplier_id, supplier_name, country,
-                    num_products_supplied
-                FROM {table_name}
-                WHERE supplier_id IS NOT NULL
-            """).df()
-
-        elif table_name == "products":
-            df_clean = con.execute(f"""
-                SELECT 
-                    product_id, product_name, price, rating
-                FROM {table_name}
-                WHERE product_id IS NOT NULL AND price > 0
-            """).df()
-
-        elif table_name == "returns":
-            df_clean = con.execute(f"""
-                SELECT 
-                    return_id, order_id, reason, refund_amount, return_date
-                FROM {table_name}
-                WHERE order_id IS NOT NULL
-            """).df()
-
-        elif table_name == "employees":
-            df_clean = con.execute(f"""
-                SELECT 
-                    employee_id, full_name, role, salary
-                FROM {table_name}
-                WHERE employee_id IS NOT NULL
-            """).df()
-
+        profile = resolve_profile(table_name, write_profile)
+        query = sorted_query(CLEAN_QUERIES[table_name].format(source=table_name), table_name, profile)
+        partitioned = partitioned and table_name in PARTITION_SPECS
+        out_path = table_path(table_name, partitioned, PARQUET_DIR)
+        clear_table_output(table_name, PARQUET_DIR)
+        if partitioned:
+            # Save cleaned, hive-partitioned Parquet
+            connection.execute(partitioned_copy_sql(query, table_name, PARQUET_DIR, duckdb_copy_options(profile)))
         else:
+            # Save cleaned Parquet
+            df_clean = connection.execute(query).df()
+            df_clean.to_parquet(out_path, index=False, **pyarrow_write_kwargs(profile))
+        print(f"✅ Cleaned & saved {table_name} -> {out_path.name}")
+        return out_path
+
+    except Exception as e:
+        print(f"⚠️ Failed to clean {table_name}.json: {e}")
+
+def find_source_file(table_name: str):
+    # Prefer streamed NDJSON output, fall back to the JSON array
+    for ext in (".jsonl", ".json"):
+        path = JSON_DIR / f"{table_name}{ext}"
+        if path.exists():
+            return path
+    return None
+
+def duckdb_source(path: Path, uuid_cols: list) -> str:
+    # read_json_auto infers UUID-looking strings as UUID; keep them as text like the pandas path
+    reader = f"read_json_auto('{path.as_posix()}')"
+    if not uuid_cols:
+        return reader
+    replacements = ", ".join(f"CAST({col} AS VARCHAR) AS {col}" for col in uuid_cols)
+    return f"(SELECT * REPLACE ({replacements}) FROM {reader})"
+
+def clean_table_duckdb(table_name: str, connection=None, partitioned: bool = False,
+                       write_profile: str = "default"):
+    # Read, clean and write entirely inside DuckDB: no pandas round-trip
+    try:
+        if table_name not in CLEAN_QUERIES:
             print(f"❌ No rules defined for {table_name}")
             return
 
-        # Save cleaned Parquet
-        out_path = PARQUET_DIR / f"{table_name}.parquet"
-        df_clean.to_parquet(out_path, index=False)
+        source_path = find_source_file(table_name)
+        if source_path is None:
+            print(f"⚠️ Failed to clean {table_name}: no source file in {JSON_DIR}")
+            return
+
+        connection = connection or con
+        columns = connection.execute(
+            f"DESCRIBE SELECT * FROM read_json_auto('{source_path.as_posix()}')"
+        ).fetchdf()["column_name"].tolist()
+        uuid_cols = [col for col in UUID_COLUMNS.get(table_name, []) if col in columns]
+        profile = resolve_profile(table_name, write_profile)
+        query = CLEAN_QUERIES[table_name].format(source=duckdb_source(source_path, uuid_cols))
+        query = sorted_query(query, table_name, profile)
+
+        partitioned = partitioned and table_name in PARTITION_SPECS
+        out_path = table_path(table_name, partitioned, PARQUET_DIR)
+        clear_table_output(table_name, PARQUET_DIR)
+        if partitioned:
+            connection.execute(partitioned_copy_sql(query, table_name, PARQUET_DIR, duckdb_copy_options(profile)))
+        else:
+            connection.execute(f"COPY ({query}) TO '{out_path.as_posix()}' ({duckdb_copy_options(profile)})")
         print(f"✅ Cleaned & saved {table_name} -> {out_path.name}")
+        return out_path
 
     except Exception as e:
-        print(f"⚠️ Failed to clean {table_name}.json: {e}")
+        print(f"⚠️ Failed to clean {table_name}: {e}")
+
+def run_clean(table_name: str, engine: str = "pandas", connection=None, manifest: Manifest = None,
+              partitioned: bool = False, write_profile: str = "default"):
+    # Clean one table, skipping it when its source and cleaning code are unchanged
+    source_path = find_source_file(table_name) if engine == "duckdb" else JSON_DIR / f"{table_name}.json"
+    partitioned = partitioned and table_name in PARTITION_SPECS
+    out_path = table_path(table_name, partitioned, PARQUET_DIR)
+    inputs = [source_path, *CODE_INPUTS] if source_path else []
+    params = {"engine": engine, "query": CLEAN_QUERIES.get(table_name, "").strip()}
+    if partitioned:
+        params["partition"] = PARTITION_SPECS[table_name][1]
+    if write_profile != "default":
+        params["write_profile"] = resolve_profile(table_name, write_profile)
+    if manifest and inputs and manifest.is_up_to_date(out_path, inputs, params):
+        print(f"⏩ Up to date: {out_path.name}")
+        return out_path
+
+    if engine == "duckdb":
+        result = clean_table_duckdb(table_name, connection, partitioned, write_profile)
+    else:
+        result = clean_table(table_name, connection, partitioned, write_profile)
+    if manifest and result:
+        manifest.record(result, inputs, params)
+    return result
+
+def _timed_clean(table_name: str, engine: str, config: dict, manifest: Manifest = None,
+                 partitioned: bool = False, write_profile: str = "default"):
+    # Each table gets its own DuckDB instance so settings and registrations never collide
+    start = time.perf_counter()
+    connection = duckdb.connect(config=config)
+    try:
+        out_path = run_clean(table_name, engine, connection, manifest, partitioned, write_profile)
+    finally:
+        connection.close()
+    return out_path, time.perf_counter() - start
+
+def clean_tables_parallel(tables, engine: str = "duckdb", workers: int = None,
+                          threads: int = None, memory_limit_mb: int = None, manifest: Manifest = None,
+                          partitioned: bool = False, write_profile: str = "default"):
+    workers = workers or min(len(tables), os.cpu_count() or 1)
+    # Split the total thread/memory budget evenly across concurrently running tables
+    config = {"threads": max(1, (threads or os.cpu_count() or 1) // workers)}
+    if memory_limit_mb:
+        config["memory_limit"] = f"{max(1, memory_limit_mb // workers)}MB"
+
+    # Largest inputs first, so the run is bounded by the biggest table
+    def source_size(table_name):
+        path = find_source_file(table_name)
+        return path.stat().st_size if path else 0
+    ordered = sorted(tables, key=source_size, reverse=True)
+
+    run_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            table: pool.submit(_timed_clean, table, engine, config, manifest, partitioned, write_profile)
+            for table in ordered
+        }
+        timings = {table: future.result() for table, future in futures.items()}
+    wall = time.perf_counter() - run_start
+
+    print("\n⏱️ Per-table wall time:")
+    for table, (out_path, seconds) in timings.items():
+        status = "✅" if out_path else "⚠️"
+        print(f"  {status} {table:<12} {seconds:8.2f}s")
+    print(f"Total: {wall:.2f}s across {workers} workers ({config})")
+    return {table: seconds for table, (_, seconds) in timings.items()}
 
 if __name__ == "__main__":
-    for table in UUID_COLUMNS:
-        clean_table(table)
+    parser = argparse.ArgumentParser(description="Clean JSON tables and export them to Parquet")
+    parser.add_argument("--engine", choices=["pandas", "duckdb"], default="pandas",
+                        help="pandas: json.load + DataFrame; duckdb: DuckDB readers streamed with COPY ... TO")
+    parser.add_argument("--parallel", action="store_true", help="Clean all tables concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="Tables cleaned at the same time")
+    parser.add_argument("--threads", type=int, default=None, help="Total DuckDB thread budget")
+    parser.add_argument("--memory-limit-mb", type=int, default=None, help="Total DuckDB memory budget")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip tables whose source file and cleaning SQL are unchanged since the last run")
+    parser.add_argument("--partition", action="store_true",
+                        help="Write orders/deliveries/returns as hive-partitioned Parquet directories")
+    parser.add_argument("--write-profile", choices=["auto", *WRITE_PROFILES], default="default",
+                        help="Parquet codec/row-group/sort profile; auto picks one per table")
+    args = parser.parse_args()
+
+    manifest = Manifest() if args.incremental else None
+    if args.parallel:
+        clean_tables_parallel(list(UUID_COLUMNS), args.engine, args.workers, args.threads,
+                              args.memory_limit_mb, manifest, args.partition, args.write_profile)
+    else:
+        for table in UUID_COLUMNS:
+            run_clean(table, args.engine, manifest=manifest, partitioned=args.partition,
+                      write_profile=args.write_profile)
+
+    if manifest:
+        manifest.save()
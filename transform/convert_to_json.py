@@ -1,12 +1,26 @@
 import os
 import json
+import argparse
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
+from transform.manifest import Manifest
 
 INPUT_DIR = Path("data")
 OUTPUT_DIR = INPUT_DIR / "json_files"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Rows per record batch in streaming mode
+BATCH_SIZE = 65536
+# Streaming output formats and their file extensions
+STREAM_FORMATS = {"ndjson": ".jsonl", "arrow": ".arrow"}
+# Values pd.read_csv reads as missing
+CSV_NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                   "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
 def convert_file_to_json(input_path: Path):
     ext = input_path.suffix.lower()
     try:
@@ -28,10 +42,114 @@ def convert_file_to_json(input_path: Path):
         output_path = OUTPUT_DIR / f"{input_path.stem}.json"
         df.to_json(output_path, orient="records", indent=2)
         print(f"✅ Converted {input_path.name} -> {output_path.name}")
+        return output_path
+    except Exception as e:
+        print(f"❌ Failed to convert {input_path.name}: {str(e)}")
+
+def iter_record_batches(input_path: Path, batch_size: int = BATCH_SIZE):
+    # Yield the file as Arrow record batches without reading it whole
+    ext = input_path.suffix.lower()
+    if ext in (".csv", ".tsv"):
+        reader = pacsv.open_csv(
+            input_path,
+            read_options=pacsv.ReadOptions(block_size=1 << 24),
+            parse_options=pacsv.ParseOptions(delimiter="\t" if ext == ".tsv" else ","),
+            # pandas' missing-value and boolean spellings, so the values and inferred types match the json mode
+            convert_options=pacsv.ConvertOptions(null_values=CSV_NULL_VALUES, strings_can_be_null=True,
+                                                 true_values=["True", "true", "TRUE"],
+                                                 false_values=["False", "false", "FALSE"]),
+        )
+        for batch in reader:
+            yield batch
+    elif ext == ".parquet":
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=batch_size):
+            yield batch
+    elif ext == ".jsonl":
+        schema = None
+        with pd.read_json(input_path, lines=True, chunksize=batch_size) as reader:
+            for chunk in reader:
+                # Later chunks are coerced to the first chunk's schema
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                schema = table.schema
+                yield from table.to_batches()
+    else:
+        raise ValueError(f"Unsupported file: {input_path.name}")
+
+def format_temporal(batch):
+    # Dates as YYYY-MM-DD and timestamps as YYYY-MM-DDTHH:MM:SS, the text the json mode
+    # passes through from the CSVs, so read_json_auto infers DATE / TIMESTAMP for both
+    columns = []
+    for column in batch.columns:
+        if pa.types.is_date(column.type):
+            column = pc.strftime(column, format="%Y-%m-%d")
+        elif pa.types.is_timestamp(column.type):
+            seconds = column.cast(pa.timestamp("s", column.type.tz), safe=False)
+            column = pc.strftime(seconds, format="%Y-%m-%dT%H:%M:%S")
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+def write_ndjson(batches, output_path: Path):
+    with open(output_path, "w", encoding="utf-8") as f:
+        for batch in batches:
+            if batch.num_rows:
+                f.write(format_temporal(batch).to_pandas().to_json(orient="records", lines=True).rstrip("\n") + "\n")
+
+def write_arrow_ipc(batches, output_path: Path):
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_file(str(output_path), batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def convert_file_streaming(input_path: Path, fmt: str = "ndjson", batch_size: int = BATCH_SIZE):
+    ext = input_path.suffix.lower()
+    if ext == ".json":
+        print(f"⏩ Skipping already JSON: {input_path.name}")
+        return
+    if ext not in (".csv", ".tsv", ".parquet", ".jsonl"):
+        print(f"❌ Unsupported file: {input_path.name}")
+        return
+    try:
+        output_path = OUTPUT_DIR / f"{input_path.stem}{STREAM_FORMATS[fmt]}"
+        batches = iter_record_batches(input_path, batch_size)
+        if fmt == "arrow":
+            write_arrow_ipc(batches, output_path)
+        else:
+            write_ndjson(batches, output_path)
+        print(f"✅ Streamed {input_path.name} -> {output_path.name}")
+        return output_path
     except Exception as e:
         print(f"❌ Failed to convert {input_path.name}: {str(e)}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert raw data files for the validation stage")
+    parser.add_argument("--format", choices=["json", *STREAM_FORMATS], default="json",
+                        help="json: one indented JSON array per file; ndjson/arrow: chunked, bounded-memory output")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip files whose content and conversion code are unchanged since the last run")
+    args = parser.parse_args()
+
+    manifest = Manifest() if args.incremental else None
+    params = {"format": args.format}
+    extension = STREAM_FORMATS.get(args.format, ".json")
     for file in INPUT_DIR.iterdir():
         if file.is_file():
-            convert_file_to_json(file)
+            inputs = [file, Path(__file__)]
+            expected_output = OUTPUT_DIR / f"{file.stem}{extension}"
+            if manifest and manifest.is_up_to_date(expected_output, inputs, params):
+                print(f"⏩ Up to date: {expected_output.name}")
+                continue
+            if args.format == "json":
+                output_path = convert_file_to_json(file)
+            else:
+                output_path = convert_file_streaming(file, args.format, args.batch_size)
+            if manifest and output_path:
+                manifest.record(output_path, inputs, params)
+
+    if manifest:
+        manifest.save()
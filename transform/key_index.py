@@ -0,0 +1,152 @@
+import json
+import argparse
+import duckdb
+import numpy as np
+from pathlib import Path
+from transform.keys import PRIMARY_KEYS, FOREIGN_KEYS
+from transform.partitioning import PARQUET_DIR, list_tables, parquet_files, parquet_source
+
+# Persistent primary-key indexes next to the cleaned Parquet. For every table key
+# we keep the sorted 64-bit key hashes and a Bloom filter over them, so a foreign
+# key check on a new batch only hashes the batch and probes the index instead of
+# joining against the full parent table:
+#   <root>/_key_index/<table>.<column>.keys.npy   sorted uint64 hashes (md5, low half)
+#   <root>/_key_index/<table>.<column>.bloom.npy  Bloom filter bits
+#   <root>/_key_index/<table>.<column>.json       sizes and the Parquet files it was built from
+# Hashes come from DuckDB's md5_number_lower/upper, which are stable across versions.
+
+INDEX_DIR_NAME = "_key_index"
+BLOOM_BITS_PER_KEY = 10
+BLOOM_HASHES = 7
+
+
+def index_dir(root: Path = PARQUET_DIR) -> Path:
+    return root / INDEX_DIR_NAME
+
+
+def index_path(table: str, column: str, suffix: str, root: Path = PARQUET_DIR) -> Path:
+    return index_dir(root) / f"{table}.{column}.{suffix}"
+
+
+def hash_sql(column: str) -> str:
+    value = f'CAST("{column}" AS VARCHAR)'
+    return f"md5_number_lower({value}) AS lo, md5_number_upper({value}) AS hi"
+
+
+def bloom_positions(lo: np.ndarray, hi: np.ndarray, num_bits: int) -> np.ndarray:
+    # Double hashing: position_i = lo + i * hi (mod m), one row per hash function
+    steps = np.arange(BLOOM_HASHES, dtype=np.uint64)[:, None]
+    return ((lo[None, :] + steps * (hi[None, :] | np.uint64(1))) % np.uint64(num_bits)).astype(np.int64)
+
+
+class KeyIndex:
+    def __init__(self, keys: np.ndarray, bloom: np.ndarray, num_bits: int):
+        self.keys = keys
+        self.bloom = bloom
+        self.num_bits = num_bits
+
+    @classmethod
+    def from_hashes(cls, lo: np.ndarray, hi: np.ndarray):
+        keys = np.unique(lo)
+        num_bits = max(64, len(keys) * BLOOM_BITS_PER_KEY)
+        bits = np.zeros(num_bits, dtype=bool)
+        bits[bloom_positions(lo, hi, num_bits).ravel()] = True
+        return cls(keys, np.packbits(bits), num_bits)
+
+    def might_contain(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        positions = bloom_positions(lo, hi, self.num_bits)
+        bits = (self.bloom[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & 1
+        return bits.all(axis=0)
+
+    def contains(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        # Bloom filter first; only its positives are confirmed against the sorted hashes
+        found = self.might_contain(lo, hi)
+        candidates = np.flatnonzero(found)
+        if len(candidates) and len(self.keys):
+            at = np.searchsorted(self.keys, lo[candidates]).clip(max=len(self.keys) - 1)
+            found[candidates] = self.keys[at] == lo[candidates]
+        return found
+
+    def save(self, table: str, column: str, files: list, root: Path = PARQUET_DIR):
+        index_dir(root).mkdir(parents=True, exist_ok=True)
+        np.save(index_path(table, column, "keys.npy", root), self.keys)
+        np.save(index_path(table, column, "bloom.npy", root), self.bloom)
+        meta = {"table": table, "column": column, "distinct_keys": int(len(self.keys)),
+                "bloom_bits": self.num_bits, "bloom_hashes": BLOOM_HASHES, "files": files}
+        with open(index_path(table, column, "json", root), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+
+def build_index(table: str, column: str = None, root: Path = PARQUET_DIR, con=None) -> KeyIndex:
+    column = column or PRIMARY_KEYS[table]
+    con = con or duckdb.connect()
+    files = parquet_files(table, root)
+    lo, hi = con.execute(f'SELECT {hash_sql(column)} FROM {parquet_source(table, root)} '
+                         f'WHERE "{column}" IS NOT NULL').fetchnumpy().values()
+    index = KeyIndex.from_hashes(np.asarray(lo, dtype=np.uint64), np.asarray(hi, dtype=np.uint64))
+    index.save(table, column, files, root)
+    print(f"✅ Indexed {table}.{column}: {len(index.keys)} keys")
+    return index
+
+
+def load_index(table: str, column: str = None, root: Path = PARQUET_DIR, rebuild: bool = True):
+    # Load a key index; rebuild it when the table's Parquet files changed (or return None)
+    column = column or PRIMARY_KEYS[table]
+    meta_path = index_path(table, column, "json", root)
+    if meta_path.exists():
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["files"] == parquet_files(table, root):
+            return KeyIndex(np.load(index_path(table, column, "keys.npy", root)),
+                            np.load(index_path(table, column, "bloom.npy", root)), meta["bloom_bits"])
+    return build_index(table, column, root) if rebuild else None
+
+
+def find_orphans(con, relation: str, column: str, index: KeyIndex, limit: int = None) -> list:
+    # Distinct values of relation.column that are not keys of the indexed parent table
+    rows = con.execute(f'SELECT DISTINCT CAST("{column}" AS VARCHAR) AS key, {hash_sql(column)} '
+                       f'FROM {relation} WHERE "{column}" IS NOT NULL').fetchnumpy()
+    lo, hi = (np.asarray(rows[name], dtype=np.uint64) for name in ("lo", "hi"))
+    orphans = rows["key"][~index.contains(lo, hi)].tolist()
+    return orphans[:limit] if limit else orphans
+
+
+def batch_reader(path: Path) -> str:
+    if path.suffix == ".parquet":
+        return f"read_parquet('{path.as_posix()}')"
+    if path.suffix == ".csv":
+        return f"read_csv_auto('{path.as_posix()}')"
+    return f"read_json_auto('{path.as_posix()}')"
+
+
+def check_batch(table: str, path: Path, root: Path = PARQUET_DIR) -> dict:
+    # Probe every declared foreign key of `table` in a new batch file against the parent indexes
+    con = duckdb.connect()
+    results = {}
+    for child, column, parent, parent_col in FOREIGN_KEYS:
+        if child != table:
+            continue
+        orphans = find_orphans(con, batch_reader(path), column, load_index(parent, parent_col, root))
+        results[column] = orphans
+        status = "✅" if not orphans else "⚠️"
+        print(f"{status} {table}.{column} -> {parent}.{parent_col}: {len(orphans)} orphan keys")
+    con.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build primary-key indexes or check a batch against them")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="(Re)build key indexes for the cleaned tables")
+    build.add_argument("tables", nargs="*", help="Tables to index (default: all cleaned tables with a key)")
+    check = sub.add_parser("check", help="Report orphaned foreign keys in a new batch file")
+    check.add_argument("table", help="Table the batch belongs to, e.g. orders")
+    check.add_argument("path", type=Path, help="Batch file (Parquet, CSV or JSON)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        for table in args.tables or list_tables():
+            if PRIMARY_KEYS.get(table):
+                build_index(table)
+    else:
+        check_batch(args.table, args.path)
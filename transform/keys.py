@@ -0,0 +1,22 @@
+# Declared keys of the lakehouse tables (matching validation/schema/all_schema.py).
+# Tables without a single-column primary key map to None.
+
+PRIMARY_KEYS = {
+    "customers": "customer_id",
+    "orders": "order_id",
+    "inventory": "product_id",
+    "deliveries": "delivery_id",
+    "feedback": None,
+    "suppliers": "supplier_id",
+    "products": "product_id",
+    "returns": "return_id",
+    "employees": "employee_id",
+}
+
+# Declared foreign keys: (child table, column, parent table, parent column)
+FOREIGN_KEYS = [
+    ("orders", "customer_id", "customers", "customer_id"),
+    ("orders", "product_id", "products", "product_id"),
+    ("deliveries", "order_id", "orders", "order_id"),
+    ("returns", "order_id", "orders", "order_id"),
+]
@@ -1,63 +1,53 @@
-
 import duckdb
 import os
+import argparse
+from pathlib import Path
+from transform.manifest import Manifest
 
-# Create output folder for DuckDB database
-os.makedirs("duckdb", exist_ok=True)
-
-# Connect to local DuckDB instance
-con = duckdb.connect("duckdb/lakehouse.duckdb")
-
-# Load CSVs
-con.execute("""
-CREATE OR REPLACE TABLE customers AS
-SELECT * FROM read_csv_auto('data/customers.csv');
-""")
+DB_PATH = "duckdb/lakehouse.duckdb"
 
-con.execute("""
-CREATE OR REPLACE TABLE orders AS
-SELECT * FROM read_csv_auto('data/orders.csv');
-""")
+# Source file and DuckDB reader per table
+SOURCES = {
+    "customers": ("data/customers.csv", "read_csv_auto('{path}')"),
+    "orders": ("data/orders.csv", "read_csv_auto('{path}')"),
+    "inventory": ("data/inventory.csv", "read_csv_auto('{path}')"),
+    "deliveries": ("data/deliveries.csv", "read_csv_auto('{path}')"),
+    "feedback": ("data/feedback.jsonl", "read_json_auto('{path}', format='newline_delimited')"),
+    "suppliers": ("data/suppliers.tsv", "read_csv_auto('{path}', delim='\t')"),
+    "products": ("data/products.parquet", "read_parquet('{path}')"),
+    "returns": ("data/returns.jsonl", "read_json_auto('{path}', format='newline_delimited')"),
+    "employees": ("data/employees.csv", "read_csv_auto('{path}')"),
+}
 
-con.execute("""
-CREATE OR REPLACE TABLE inventory AS
-SELECT * FROM read_csv_auto('data/inventory.csv');
-""")
+parser = argparse.ArgumentParser(description="Load raw source files into the DuckDB database")
+parser.add_argument("--incremental", action="store_true",
+                    help="Skip tables whose source file is unchanged since the last load")
+args = parser.parse_args()
 
-con.execute("""
-CREATE OR REPLACE TABLE deliveries AS
-SELECT * FROM read_csv_auto('data/deliveries.csv');
-""")
-
-# Load JSONL
-con.execute("""
-CREATE OR REPLACE TABLE feedback AS
-SELECT * FROM read_json_auto('data/feedback.jsonl', format='newline_delimited');
-""")
-
-# Load TSV
-con.execute("""
-CREATE OR REPLACE TABLE suppliers AS
-SELECT * FROM read_csv_auto('data/suppliers.tsv', delim='\t');
-""")
+# Create output folder for DuckDB database
+os.makedirs("duckdb", exist_ok=True)
 
-# Load Parquet
-con.execute("""
-CREATE OR REPLACE TABLE products AS
-SELECT * FROM read_parquet('data/products.parquet');
-""")
+# Connect to local DuckDB instance
+con = duckdb.connect(DB_PATH)
+manifest = Manifest() if args.incremental else None
+existing = {row[0] for row in con.execute("SELECT table_name FROM information_schema.tables").fetchall()}
 
-# Load JSONL (returns)
-con.execute("""
-CREATE OR REPLACE TABLE returns AS
-SELECT * FROM read_json_auto('data/returns.jsonl', format='newline_delimited');
-""")
+# Load CSV, TSV, JSONL and Parquet sources
+for table, (path, reader) in SOURCES.items():
+    key = f"{DB_PATH}::{table}"
+    inputs = [Path(path), Path(__file__)]
+    if manifest and manifest.is_up_to_date(key, inputs, {"reader": reader}, output_exists=table in existing):
+        print(f"⏩ Up to date: {table}")
+        continue
+    con.execute(f"""
+    CREATE OR REPLACE TABLE {table} AS
+    SELECT * FROM {reader.format(path=path)};
+    """)
+    if manifest:
+        manifest.record(key, inputs, {"reader": reader})
 
-# Load CSV
-con.execute("""
-CREATE OR REPLACE TABLE employees AS
-SELECT * FROM read_csv_auto('data/employees.csv');
-""")
+if manifest:
+    manifest.save()
 
 # Verify counts
 tables = [
@@ -0,0 +1,77 @@
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+# Build manifest shared by the transform stages. For every output it records the
+# content hash, size and mtime of each input file (data files and the code/SQL
+# that produced it), so a stage can skip outputs whose inputs have not changed.
+
+MANIFEST_PATH = Path("output/manifest.json")
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: Path, previous: dict = None) -> dict:
+    stat = Path(path).stat()
+    # Same size and mtime as last time: reuse the recorded hash instead of re-reading the file
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous
+    return {"sha256": hash_file(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class Manifest:
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def _input_fingerprints(self, key: str, inputs) -> dict:
+        recorded = self.entries.get(key, {}).get("inputs", {})
+        return {
+            Path(p).as_posix(): file_fingerprint(p, recorded.get(Path(p).as_posix()))
+            for p in inputs
+        }
+
+    def is_up_to_date(self, output, inputs, params: dict = None, output_exists: bool = None) -> bool:
+        # An output is current if it still exists, was built from inputs with identical
+        # content hashes, and with the same stage parameters (engine, query text, ...)
+        key = str(output)
+        entry = self.entries.get(key)
+        if entry is None or entry.get("params") != (params or {}):
+            return False
+        if not (Path(key).exists() if output_exists is None else output_exists):
+            return False
+        if any(not Path(p).exists() for p in inputs):
+            return False
+        current = self._input_fingerprints(key, inputs)
+        if set(current) != set(entry["inputs"]):
+            return False
+        if any(current[p]["sha256"] != entry["inputs"][p]["sha256"] for p in current):
+            return False
+        # Touched but unchanged files: keep the new mtimes so they are not re-hashed next run
+        with self._lock:
+            entry["inputs"] = current
+        return True
+
+    def record(self, output, inputs, params: dict = None):
+        key = str(output)
+        entry = {"inputs": self._input_fingerprints(key, inputs), "params": params or {}}
+        with self._lock:
+            self.entries[key] = entry
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
@@ -0,0 +1,81 @@
+import shutil
+from pathlib import Path
+
+# Hive-partitioned layout for cleaned Parquet. A partitioned table is written to
+# output/cleaned_parquet/<table>/<column>=<value>/*.parquet instead of a single
+# <table>.parquet file; readers enable hive_partitioning so filters on the
+# partition column only open the matching directories.
+
+PARQUET_DIR = Path("output/cleaned_parquet")
+
+# Partition column and the SQL expression that derives it from the cleaned row
+PARTITION_SPECS = {
+    "orders": ("order_month", "strftime(CAST(order_timestamp AS TIMESTAMP), '%Y-%m')"),
+    "deliveries": ("courier", "courier"),
+    "returns": ("return_month", "strftime(CAST(return_date AS DATE), '%Y-%m')"),
+}
+
+# Source column of the derived month partitions. DuckDB only prunes on the partition
+# column itself, so a filter on the source column must be paired with one on the month.
+PARTITION_SOURCES = {
+    "orders": "order_timestamp",
+    "returns": "return_date",
+}
+
+
+def table_path(table_name: str, partitioned: bool, root: Path = PARQUET_DIR) -> Path:
+    return root / table_name if partitioned else root / f"{table_name}.parquet"
+
+
+def clear_table_output(table_name: str, root: Path = PARQUET_DIR):
+    # Drop both layouts so readers never see a stale file next to a partitioned directory
+    file_path = table_path(table_name, False, root)
+    dir_path = table_path(table_name, True, root)
+    if file_path.exists():
+        file_path.unlink()
+    if dir_path.is_dir():
+        shutil.rmtree(dir_path)
+
+
+def partitioned_copy_sql(query: str, table_name: str, root: Path = PARQUET_DIR,
+                         options: str = "FORMAT PARQUET") -> str:
+    column, expression = PARTITION_SPECS[table_name]
+    select = f"SELECT * FROM ({query})" if column == expression else f"SELECT *, {expression} AS {column} FROM ({query})"
+    out_dir = table_path(table_name, True, root).as_posix()
+    return f"COPY ({select}) TO '{out_dir}' ({options}, PARTITION_BY ({column}))"
+
+
+def parquet_source(table_name: str, root: Path = PARQUET_DIR) -> str:
+    # DuckDB reader for a cleaned table, whichever layout it was written in
+    dir_path = table_path(table_name, True, root)
+    if dir_path.is_dir():
+        return f"read_parquet('{dir_path.as_posix()}/**/*.parquet', hive_partitioning = true)"
+    return f"read_parquet('{table_path(table_name, False, root).as_posix()}')"
+
+
+def list_tables(root: Path = PARQUET_DIR) -> list:
+    if not root.is_dir():
+        return []
+    names = {p.stem for p in root.glob("*.parquet")}
+    names |= {p.name for p in root.iterdir() if p.is_dir() and any(p.rglob("*.parquet"))}
+    return sorted(names)
+
+
+def parquet_files(table_name: str, root: Path = PARQUET_DIR) -> list:
+    # [path, size, mtime_ns] of every Parquet file behind a table; the fingerprint used by the indexes and caches
+    dir_path = table_path(table_name, True, root)
+    files = sorted(dir_path.rglob("*.parquet")) if dir_path.is_dir() else [table_path(table_name, False, root)]
+    return [[p.as_posix(), p.stat().st_size, p.stat().st_mtime_ns] for p in files if p.exists()]
+
+
+def with_partition_filters(table_name: str, filters: dict, root: Path = PARQUET_DIR) -> dict:
+    # {column: [values]} plus the partition-month filter implied by a filter on the source column.
+    # ISO text, dates and timestamps all start with YYYY-MM, the value strftime('%Y-%m') wrote.
+    source = PARTITION_SOURCES.get(table_name)
+    if source not in filters or not table_path(table_name, True, root).is_dir():
+        return filters
+    partition_col = PARTITION_SPECS[table_name][0]
+    months = sorted({str(value)[:7] for value in filters[source] if value is not None})
+    if partition_col in filters:
+        months = [month for month in months if month in set(map(str, filters[partition_col]))]
+    return {**filters, partition_col: months}
@@ -1,8 +1,14 @@
-
+import os
+import json
+import argparse
 import duckdb
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from transform.keys import PRIMARY_KEYS
 
-# Connect to existing DB
-con = duckdb.connect("duckdb/lakehouse.duckdb")
+DB_PATH = "duckdb/lakehouse.duckdb"
+AUDIT_PATH = Path("output/audit.json")
+DUPLICATE_SAMPLE_SIZE = 5
 
 # List of tables to analyze
 tables = [
@@ -10,44 +16,127 @@ tables = [
     "feedback", "suppliers", "products", "returns", "employees"
 ]
 
-print("🔍 Profiling Summary")
-print("=" * 50)
+def profile_summary(con):
+    print("🔍 Profiling Summary")
+    print("=" * 50)
 
-for table in tables:
-    print(f"\n📊 Table: {table}")
+    for table in tables:
+        print(f"\n📊 Table: {table}")
     
-    # Total row count
-    row_count = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
-    print(f"Total rows: {row_count}")
+        # Total row count
+        row_count = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"Total rows: {row_count}")
     
-    # Get column names
-    cols = con.execute(f"PRAGMA table_info('{table}')").fetchdf()["name"].tolist()
+        # Get column names
+        cols = con.execute(f"PRAGMA table_info('{table}')").fetchdf()["name"].tolist()
     
-    # Null analysis per column
-    print("Null values per column:")
-    for col in cols:
-        null_count = con.execute(f"SELECT COUNT(*) FROM {table} WHERE {col} IS NULL").fetchone()[0]
-        if null_count > 0:
-            print(f"  ⚠️  {col}: {null_count} nulls")
-    print("✅ Null scan complete.")
-
-    # Duplicate check based on likely key
-    pk_col = f"{table[:-1]}_id" if table != "inventory" else "product_id"
-    try:
-        duplicates = con.execute(f'''
-            SELECT {pk_col}, COUNT(*) AS dupes
+        # Null analysis per column
+        print("Null values per column:")
+        for col in cols:
+            null_count = con.execute(f"SELECT COUNT(*) FROM {table} WHERE {col} IS NULL").fetchone()[0]
+            if null_count > 0:
+                print(f"  ⚠️  {col}: {null_count} nulls")
+        print("✅ Null scan complete.")
+
+        # Duplicate check based on likely key
+        pk_col = f"{table[:-1]}_id" if table != "inventory" else "product_id"
+        try:
+            duplicates = con.execute(f'''
+                SELECT {pk_col}, COUNT(*) AS dupes
+                FROM {table}
+                GROUP BY {pk_col}
+                HAVING COUNT(*) > 1
+                LIMIT 5;
+            ''').fetchdf()
+            if not duplicates.empty:
+                print(f"⚠️  Duplicate {pk_col} values:")
+                print(duplicates)
+            else:
+                print(f"✅ No duplicates in {pk_col}")
+        except Exception as e:
+            print(f"⚠️  Skipped duplicate check for {table}: {str(e)}")
+
+def audit_query(table: str, columns: list, pk_col: str = None) -> str:
+    # Null counts for every column and key duplicates from a single scan of the table
+    if pk_col is None:
+        nulls = ", ".join(f'COUNT(*) - COUNT("{col}")' for col in columns)
+        return f"SELECT COUNT(*), {nulls}, NULL, NULL, NULL FROM {table}"
+    per_key = ", ".join(f'COUNT(*) - COUNT("{col}") AS "{col}"' for col in columns)
+    nulls = ", ".join(f'SUM("{col}")' for col in columns)
+    return f"""
+        WITH per_key AS (
+            SELECT "{pk_col}" AS key, COUNT(*) AS n, {per_key}
             FROM {table}
-            GROUP BY {pk_col}
-            HAVING COUNT(*) > 1
-            LIMIT 5;
-        ''').fetchdf()
-        if not duplicates.empty:
-            print(f"⚠️  Duplicate {pk_col} values:")
-            print(duplicates)
-        else:
-            print(f"✅ No duplicates in {pk_col}")
+            GROUP BY "{pk_col}"
+        )
+        SELECT SUM(n), {nulls},
+               COUNT(*) FILTER (WHERE n > 1 AND key IS NOT NULL),
+               COALESCE(SUM(n - 1) FILTER (WHERE n > 1 AND key IS NOT NULL), 0),
+               list({{'{pk_col}': CAST(key AS VARCHAR), 'dupes': n}} ORDER BY n DESC, key)
+                   FILTER (WHERE n > 1 AND key IS NOT NULL)[1:{DUPLICATE_SAMPLE_SIZE}]
+        FROM per_key
+    """
+
+def audit_table(con, table: str) -> dict:
+    cursor = con.cursor()
+    try:
+        columns = [row[0] for row in cursor.execute(f"DESCRIBE {table}").fetchall()]
+        pk_col = PRIMARY_KEYS.get(table)
+        if pk_col not in columns:
+            pk_col = None
+        stats = cursor.execute(audit_query(table, columns, pk_col)).fetchone()
+        row_count, null_counts = stats[0] or 0, stats[1:1 + len(columns)]
+        duplicate_keys, duplicate_rows, sample = stats[1 + len(columns):]
+        return {
+            "table": table,
+            "row_count": int(row_count),
+            "null_counts": {col: int(n or 0) for col, n in zip(columns, null_counts)},
+            "primary_key": pk_col,
+            "duplicate_keys": duplicate_keys,
+            "duplicate_rows": duplicate_rows,
+            "duplicate_sample": sample or [],
+        }
     except Exception as e:
-        print(f"⚠️  Skipped duplicate check for {table}: {str(e)}")
+        return {"table": table, "error": str(e)}
+    finally:
+        cursor.close()
+
+def audit(con, tables: list, workers: int = None, output_path: Path = AUDIT_PATH) -> list:
+    # Audit tables in parallel (one cursor each) and write the results as JSON
+    workers = workers or min(len(tables), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda table: audit_table(con, table), tables))
+
+    for result in results:
+        if "error" in result:
+            print(f"⚠️  Skipped audit for {result['table']}: {result['error']}")
+            continue
+        nulls = sum(1 for n in result["null_counts"].values() if n)
+        dupes = f"{result['duplicate_keys']} duplicate keys" if result["primary_key"] else "no primary key"
+        print(f"✅ {result['table']}: {result['row_count']} rows, {nulls} columns with nulls, {dupes}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file first so a failed dump never leaves a truncated report
+    tmp_path = output_path.with_suffix(f"{output_path.suffix}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+    os.replace(tmp_path, output_path)
+    print(f"📝 Audit written to {output_path}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the DuckDB tables before cleaning")
+    parser.add_argument("--audit", action="store_true",
+                        help="Single-pass null/duplicate audit per table, run in parallel, written as JSON")
+    parser.add_argument("--workers", type=int, default=None, help="Tables audited at the same time")
+    parser.add_argument("--output", type=Path, default=AUDIT_PATH, help="Audit JSON output path")
+    args = parser.parse_args()
 
-con.close()
-print("\n🧼 Ready to start cleaning in the next step.")
+    # Connect to existing DB
+    con = duckdb.connect(DB_PATH, read_only=args.audit)
+    if args.audit:
+        audit(con, tables, args.workers, args.output)
+    else:
+        profile_summary(con)
+    con.close()
+    print("\n🧼 Ready to start cleaning in the next step.")
@@ -0,0 +1,136 @@
+import time
+import argparse
+import tempfile
+import duckdb
+from pathlib import Path
+from transform.partitioning import PARQUET_DIR, list_tables, parquet_source
+
+# Parquet write profiles: codec and level, row-group size, dictionary encoding and
+# whether rows are sorted by the table's key. Sorting a lookup-heavy table by its
+# key keeps each row group's min/max statistics narrow, so point lookups on that
+# key skip almost every row group.
+
+WRITE_PROFILES = {
+    "default": {},
+    "scan-optimized": {
+        "compression": "zstd",
+        "compression_level": 6,
+        "row_group_size": 1_000_000,
+        "dictionary": True,
+        "sorted": False,
+    },
+    "lookup-optimized": {
+        "compression": "snappy",
+        "compression_level": None,
+        "row_group_size": 50_000,
+        "dictionary": False,
+        "sorted": True,
+    },
+}
+
+# Profile chosen per table by --write-profile auto
+TABLE_PROFILES = {
+    "customers": "lookup-optimized",
+    "orders": "lookup-optimized",
+    "products": "lookup-optimized",
+    "inventory": "scan-optimized",
+    "deliveries": "scan-optimized",
+    "feedback": "scan-optimized",
+    "suppliers": "scan-optimized",
+    "returns": "scan-optimized",
+    "employees": "scan-optimized",
+}
+
+# Sort key used by profiles with "sorted": True
+SORT_KEYS = {
+    "customers": "customer_id",
+    "orders": "order_id",
+    "products": "product_id",
+    "inventory": "product_id",
+    "deliveries": "delivery_id",
+    "feedback": "supplier_id",
+    "suppliers": "supplier_id",
+    "returns": "return_id",
+    "employees": "employee_id",
+}
+
+
+def resolve_profile(table_name: str, profile_name: str = "default") -> dict:
+    if profile_name == "auto":
+        profile_name = TABLE_PROFILES.get(table_name, "default")
+    return WRITE_PROFILES[profile_name]
+
+
+def sorted_query(query: str, table_name: str, profile: dict) -> str:
+    key = SORT_KEYS.get(table_name)
+    if not profile.get("sorted") or key is None:
+        return query
+    return f"SELECT * FROM ({query}) ORDER BY {key}"
+
+
+def duckdb_copy_options(profile: dict) -> str:
+    options = ["FORMAT PARQUET"]
+    if profile.get("compression"):
+        options.append(f"COMPRESSION {profile['compression']}")
+    if profile.get("compression_level") is not None:
+        options.append(f"COMPRESSION_LEVEL {profile['compression_level']}")
+    if profile.get("row_group_size"):
+        options.append(f"ROW_GROUP_SIZE {profile['row_group_size']}")
+    if profile.get("dictionary") is False:
+        options.append("DICTIONARY_SIZE_LIMIT 0")
+    return ", ".join(options)
+
+
+def pyarrow_write_kwargs(profile: dict) -> dict:
+    # Keyword arguments for DataFrame.to_parquet / pyarrow.parquet.write_table
+    kwargs = {}
+    if profile.get("compression"):
+        kwargs["compression"] = profile["compression"]
+    if profile.get("compression_level") is not None:
+        kwargs["compression_level"] = profile["compression_level"]
+    if profile.get("row_group_size"):
+        kwargs["row_group_size"] = profile["row_group_size"]
+    if "dictionary" in profile:
+        kwargs["use_dictionary"] = profile["dictionary"]
+    return kwargs
+
+
+def _timed(con, sql: str, params: list = None, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        con.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def profile_report(tables=None, root: Path = PARQUET_DIR):
+    # Rewrite each cleaned table under every profile and compare size, full-scan and key-lookup time
+    con = duckdb.connect()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for table in tables or list_tables(root):
+            source = f"SELECT * FROM {parquet_source(table, root)}"
+            key = SORT_KEYS.get(table)
+            probe = con.execute(f"SELECT {key} FROM ({source}) USING SAMPLE 1 ROWS").fetchone() if key else None
+            for name, profile in WRITE_PROFILES.items():
+                out_path = Path(tmp) / f"{table}_{name}.parquet"
+                con.execute(f"COPY ({sorted_query(source, table, profile)}) TO '{out_path.as_posix()}' "
+                            f"({duckdb_copy_options(profile)})")
+                reader = f"read_parquet('{out_path.as_posix()}')"
+                scan = _timed(con, f"SELECT MAX(COLUMNS(*)) FROM {reader}")
+                lookup = _timed(con, f"SELECT * FROM {reader} WHERE {key} = ?", [probe[0]]) if probe else None
+                rows.append((table, name, out_path.stat().st_size, scan, lookup))
+
+    print(f"{'table':<12} {'profile':<18} {'size (KB)':>10} {'scan (ms)':>10} {'lookup (ms)':>12}")
+    for table, name, size, scan, lookup in rows:
+        lookup_ms = f"{lookup * 1000:12.2f}" if lookup is not None else f"{'-':>12}"
+        print(f"{table:<12} {name:<18} {size / 1024:10.1f} {scan * 1000:10.2f} {lookup_ms}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Parquet write profiles on the cleaned tables")
+    parser.add_argument("tables", nargs="*", help="Tables to compare (default: all cleaned tables)")
+    args = parser.parse_args()
+    profile_report(args.tables or None)
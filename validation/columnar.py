@@ -0,0 +1,117 @@
+import types
+import typing
+import numpy as np
+import pandas as pd
+from datetime import date
+
+# Columnar validation: each Pydantic model field becomes a vectorized check on a
+# whole DataFrame column (type, nullability, date format). The checks are
+# conservative - a row they accept is always accepted by the model - so only the
+# rows they flag need to go through Pydantic, which then either coerces them or
+# produces the detailed error messages.
+
+ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+def field_specs(schema) -> list:
+    # (name, base type, nullable, key required) for every model field
+    specs = []
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        nullable = False
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+            args = [a for a in typing.get_args(annotation) if a is not type(None)]
+            nullable = len(args) < len(typing.get_args(annotation))
+            annotation = args[0] if len(args) == 1 else object
+        specs.append((name, annotation, nullable, field.is_required()))
+    return specs
+
+
+def _is_bool_dtype(series: pd.Series) -> bool:
+    return pd.api.types.is_bool_dtype(series.dtype)
+
+
+def check_str(series: pd.Series):
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.notna(), series
+    if series.dtype == object:
+        return series.map(lambda v: type(v) is str).astype(bool), series
+    return pd.Series(False, index=series.index), series
+
+
+def check_int(series: pd.Series):
+    if pd.api.types.is_integer_dtype(series.dtype) and not _is_bool_dtype(series):
+        return series.notna(), series.astype("Int64")
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        integral = np.isfinite(values) & (np.mod(values, 1) == 0)
+        valid = pd.Series(integral, index=series.index)
+        return valid, series.where(valid).astype("Int64")
+    if series.dtype == object:
+        # Mixed column (e.g. one stray string): accept the real ints element by element
+        valid = series.map(lambda v: type(v) is int and -2**63 <= v < 2**63).astype(bool)
+        return valid, pd.to_numeric(series.where(valid), errors="coerce").astype("Int64")
+    return pd.Series(False, index=series.index), series
+
+
+def check_float(series: pd.Series):
+    if pd.api.types.is_numeric_dtype(series.dtype) and not _is_bool_dtype(series):
+        return series.notna(), series.astype(float)
+    if series.dtype == object:
+        valid = series.map(lambda v: type(v) in (int, float)).astype(bool)
+        return valid, pd.to_numeric(series.where(valid), errors="coerce").astype(float)
+    return pd.Series(False, index=series.index), series
+
+
+def check_bool(series: pd.Series):
+    if _is_bool_dtype(series):
+        return series.notna(), series
+    if series.dtype == object:
+        return series.map(lambda v: type(v) is bool).astype(bool), series
+    return pd.Series(False, index=series.index), series
+
+
+def check_date(series: pd.Series):
+    # Plain YYYY-MM-DD strings that are real calendar dates; anything else goes to Pydantic
+    valid, _ = check_str(series)
+    text = series.where(valid).astype("string")
+    valid &= text.str.match(ISO_DATE_PATTERN).fillna(False).astype(bool)
+    parsed = pd.to_datetime(text.where(valid), format="%Y-%m-%d", errors="coerce")
+    valid &= parsed.notna()
+    return valid, text.where(valid)
+
+
+TYPE_CHECKS = {
+    str: check_str,
+    int: check_int,
+    float: check_float,
+    bool: check_bool,
+    date: check_date,
+}
+
+
+def validate_frame(df: pd.DataFrame, schema, records: list = None):
+    # Returns the coerced model columns and a mask of rows that need Pydantic
+    needs_model = pd.Series(False, index=df.index)
+    coerced = pd.DataFrame(index=df.index)
+    for name, base_type, nullable, required in field_specs(schema):
+        check = TYPE_CHECKS.get(base_type)
+        if name not in df.columns or check is None:
+            # Missing column or a type we cannot check in bulk: every row falls back
+            needs_model[:] = True
+            continue
+        series = df[name]
+        nulls = series.isna()
+        valid, values = check(series)
+        valid = valid & ~nulls
+        if nullable:
+            accepted_nulls = nulls
+            if required and records is not None and nulls.any():
+                # A null may also be a missing key, which Pydantic rejects
+                present = [name in records[i] for i in np.flatnonzero(nulls.to_numpy())]
+                accepted_nulls = nulls.copy()
+                accepted_nulls[nulls] = present
+            valid = valid | accepted_nulls
+        needs_model |= ~valid
+        coerced[name] = values.where(~nulls, None)
+    return coerced, needs_model
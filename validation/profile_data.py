@@ -1,60 +1,94 @@
 import os
+import re
 import json
-import pandas as pd
+import argparse
 import duckdb
+import pyarrow.compute as pc
 from pathlib import Path
+from validation.sketches import ColumnSketch
 
 INPUT_FOLDER = Path("data/json_files")
 OUTPUT_FOLDER = Path("validation/profiles")
 OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
 
-def profile_table(file_path: Path, table_name: str):
+INTEGER_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+                 "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT"}
+FLOAT_TYPES = {"FLOAT", "DOUBLE", "REAL"}
+TEMPORAL_TYPES = {"DATE", "TIMESTAMP", "TIMESTAMP WITH TIME ZONE", "TIMESTAMP_S", "TIMESTAMP_MS", "TIMESTAMP_NS"}
+# DuckDB type -> dtype label without / with nulls. The labels are those of the original
+# pandas 2 profiles and are fixed here, so they do not depend on the installed pandas
+# (pandas 3 would label the same columns str / datetime64[us]). Unlisted types are "object".
+DTYPE_LABELS = {
+    **{duck_type: ("int64", "float64") for duck_type in INTEGER_TYPES},
+    **{duck_type: ("float64", "float64") for duck_type in FLOAT_TYPES},
+    "DECIMAL": ("float64", "float64"),
+    "BOOLEAN": ("bool", "object"),
+}
+# Column names pandas.read_json turns into datetimes (keep_default_dates)
+DATE_LIKE_NAME = re.compile(r"(_at|_time)$|^timestamp|^(modified|date|datetime)$")
+QUANTILES = [0.25, 0.5, 0.75]
+SKETCH_BATCH_ROWS = 1_000_000
+
+def pandas_dtype(column: str, duck_type: str, null_count: int) -> str:
+    # pandas.read_json parsed date-like columns to datetime64[ns]; everything else via DTYPE_LABELS
+    if DATE_LIKE_NAME.search(column.lower()) and (duck_type in TEMPORAL_TYPES or duck_type in INTEGER_TYPES):
+        return "datetime64[ns]"
+    without_nulls, with_nulls = DTYPE_LABELS.get(duck_type.split("(")[0], ("object", "object"))
+    return without_nulls if null_count == 0 else with_nulls
+
+def is_numeric(duck_type: str) -> bool:
+    return duck_type in INTEGER_TYPES or duck_type in FLOAT_TYPES \
+        or duck_type.startswith("DECIMAL") or duck_type == "BOOLEAN"
+
+def format_bound(value, dtype: str):
+    if value is None or dtype not in ("int64", "float64", "bool"):
+        return None
+    if dtype == "float64":
+        return str(float(value))
+    return str(value)
+
+def profile_table(file_path: Path, table_name: str, approx: bool = False, quantiles: bool = False):
     try:
-        # Load the JSON file into a Pandas DataFrame
-        df = pd.read_json(file_path, orient='records', lines=False)
-        if df.empty:
+        con = duckdb.connect(database=':memory:')
+        source = f"read_json_auto('{file_path.as_posix()}')"
+        schema = con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        if not schema:
             raise ValueError("Empty dataframe.")
+        columns = [(name, duck_type) for name, duck_type, *_ in schema]
 
-        # Connect to DuckDB in-memory DB
-        con = duckdb.connect(database=':memory:')
-        con.register(table_name, df)
-
-        # Get column-wise statistics
-        profile_query = f"""
-        SELECT 
-            column_name,
-            MIN(value) AS min_value,
-            MAX(value) AS max_value,
-            COUNT(*) AS total_count,
-            COUNT(*) - COUNT(value) AS null_count,
-            COUNT(DISTINCT value) AS distinct_count
-        FROM (
-            SELECT 
-                column_name,
-                UNNEST([%s]) AS value
-            FROM (
-                SELECT 
-                    UNNEST(['%s']) AS column_name
-            )
-        ) 
-        GROUP BY column_name;
-        """ % (
-            ', '.join([f'"{col}"' for col in df.columns]),
-            "', '".join(df.columns)
-        )
-
-        # Alternatively, collect stats per column via Python for simplicity
+        # Every column statistic in one aggregate, so DuckDB scans the file once (in parallel)
+        distinct = "approx_count_distinct({col})" if approx else "COUNT(DISTINCT {col})"
+        select = ["COUNT(*)"]
+        for name, duck_type in columns:
+            col = f'"{name}"'
+            select += [f"COUNT({col})", distinct.format(col=col)]
+            numeric = is_numeric(duck_type)
+            select += [f"MIN({col})", f"MAX({col})"] if numeric else ["NULL", "NULL"]
+            if quantiles:
+                select.append(f"approx_quantile({col}, {QUANTILES})" if numeric and duck_type != "BOOLEAN" else "NULL")
+        stats = con.execute(f"SELECT {', '.join(select)} FROM {source}").fetchone()
+        if stats[0] == 0:
+            raise ValueError("Empty dataframe.")
+
+        total, values = stats[0], iter(stats[1:])
         profile = []
-        for col in df.columns:
-            series = df[col]
-            profile.append({
-                "column": col,
-                "dtype": str(series.dtype),
-                "min": str(series.min()) if pd.api.types.is_numeric_dtype(series) else None,
-                "max": str(series.max()) if pd.api.types.is_numeric_dtype(series) else None,
-                "null_count": int(series.isnull().sum()),
-                "distinct_count": int(series.nunique())
-            })
+        for name, duck_type in columns:
+            non_null, distinct_count, min_value, max_value = (next(values) for _ in range(4))
+            null_count = total - non_null
+            dtype = pandas_dtype(name, duck_type, null_count)
+            entry = {
+                "column": name,
+                "dtype": dtype,
+                "min": format_bound(min_value, dtype),
+                "max": format_bound(max_value, dtype),
+                "null_count": int(null_count),
+                "distinct_count": int(distinct_count)
+            }
+            if quantiles:
+                points = next(values)
+                entry["quantiles"] = dict(zip([f"p{int(q * 100)}" for q in QUANTILES], points)) if points else None
+            profile.append(entry)
+        con.close()
 
         # Save profile to JSON
         output_path = OUTPUT_FOLDER / f"{table_name}_profile.json"
@@ -65,7 +99,78 @@ def profile_table(file_path: Path, table_name: str):
     except Exception as e:
         print(f"⚠️ Failed to profile {file_path.name}: {e}")
 
-def main():
+def source_reader(file_path: Path) -> str:
+    if file_path.suffix == ".parquet":
+        return f"read_parquet('{file_path.as_posix()}')"
+    return f"read_json_auto('{file_path.as_posix()}')"
+
+def sketch_file(file_path: Path) -> dict:
+    # Build column sketches for one file (a full table or a new batch) in a single streamed scan
+    con = duckdb.connect(database=':memory:')
+    source = source_reader(file_path)
+    columns = [(name, duck_type) for name, duck_type, *_ in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+    select = []
+    for name, duck_type in columns:
+        col = f'"{name}"'
+        select.append(f"CASE WHEN {col} IS NULL THEN NULL ELSE hash({col}) END")
+        select.append(col if is_numeric(duck_type) else "NULL")
+    sketches = {name: ColumnSketch(duck_type, is_numeric(duck_type)) for name, duck_type in columns}
+    reader = con.execute(f"SELECT {', '.join(select)} FROM {source}").to_arrow_reader(SKETCH_BATCH_ROWS)
+    for batch in reader:
+        for i, (name, _) in enumerate(columns):
+            hashes = pc.drop_null(batch.column(2 * i))
+            values = pc.drop_null(batch.column(2 * i + 1))
+            sketches[name].add_batch(hashes.to_numpy(), values.to_numpy(zero_copy_only=False),
+                                     batch.num_rows - len(hashes), batch.num_rows)
+    con.close()
+    return sketches
+
+def load_sketches(table_name: str) -> dict:
+    path = OUTPUT_FOLDER / f"{table_name}_sketch.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {name: ColumnSketch.from_dict(data) for name, data in json.load(f).items()}
+
+def profile_from_sketches(sketches: dict, quantiles: bool = False) -> list:
+    profile = []
+    for name, sketch in sketches.items():
+        dtype = pandas_dtype(name, sketch.duck_type, sketch.null_count)
+        entry = {
+            "column": name,
+            "dtype": dtype,
+            "min": format_bound(sketch.min, dtype),
+            "max": format_bound(sketch.max, dtype),
+            "null_count": int(sketch.null_count),
+            "distinct_count": sketch.hll.estimate() if sketch.count > sketch.null_count else 0
+        }
+        if quantiles:
+            entry["quantiles"] = {f"p{int(q * 100)}": sketch.digest.quantile(q) for q in QUANTILES} \
+                if sketch.digest is not None and len(sketch.digest.means) else None
+        profile.append(entry)
+    return profile
+
+def update_profile(file_path: Path, table_name: str, reset: bool = False, quantiles: bool = False):
+    # Sketch only this file and merge it into the table's running sketches
+    try:
+        batch = sketch_file(file_path)
+        running = {} if reset else load_sketches(table_name)
+        for name, sketch in batch.items():
+            if name in running:
+                running[name].merge(sketch)
+            else:
+                running[name] = sketch
+
+        with open(OUTPUT_FOLDER / f"{table_name}_sketch.json", "w", encoding="utf-8") as f:
+            json.dump({name: sketch.to_dict() for name, sketch in running.items()}, f)
+        with open(OUTPUT_FOLDER / f"{table_name}_profile.json", "w", encoding="utf-8") as f:
+            json.dump(profile_from_sketches(running, quantiles), f, indent=2)
+
+        print(f"✅ Profiled {file_path.name} into {table_name} sketches")
+    except Exception as e:
+        print(f"⚠️ Failed to profile {file_path.name}: {e}")
+
+def main(approx: bool = False, quantiles: bool = False):
     files = list(INPUT_FOLDER.glob("*.json"))
     if not files:
         print("❌ No JSON files found to profile.")
@@ -73,7 +178,22 @@ def main():
 
     for file_path in files:
         table_name = file_path.stem
-        profile_table(file_path, table_name)
+        profile_table(file_path, table_name, approx, quantiles)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Profile JSON tables with a single DuckDB scan per table")
+    parser.add_argument("--approx", action="store_true", help="HyperLogLog distinct counts instead of exact")
+    parser.add_argument("--quantiles", action="store_true", help="Add approximate p25/p50/p75 for numeric columns")
+    parser.add_argument("--sketches", action="store_true",
+                        help="Rebuild mergeable sketches (<table>_sketch.json) for every table")
+    parser.add_argument("--batch", type=Path, help="New batch file to merge into an existing table profile")
+    parser.add_argument("--table", help="Table the --batch file belongs to (default: file stem)")
+    args = parser.parse_args()
+
+    if args.batch:
+        update_profile(args.batch, args.table or args.batch.stem, quantiles=args.quantiles)
+    elif args.sketches:
+        for file_path in INPUT_FOLDER.glob("*.json"):
+            update_profile(file_path, file_path.stem, reset=True, quantiles=args.quantiles)
+    else:
+        main(args.approx, args.quantiles)
@@ -0,0 +1,169 @@
+import math
+import base64
+import numpy as np
+
+# Mergeable column sketches for incremental profiling. Every sketch can be built
+# from one batch and merged with the running sketch of the table, so profiling
+# cost scales with the batch instead of the full history:
+#   - HyperLogLog registers for distinct counts (merge = element-wise max)
+#   - a merging t-digest for quantiles (merge = union of centroids + compress)
+#   - row/null counts and min/max (merge = sum / min / max)
+
+HLL_PRECISION = 14
+TDIGEST_DELTA = 100
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes: np.ndarray):
+        # hashes: uniformly distributed uint64 values (DuckDB hash())
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes << np.uint64(p)
+        # Rank = position of the first set bit in the remaining 64 - p bits
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - p + 1, np.clip(65 - exponent, 1, 64 - p + 1)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+    def to_dict(self) -> dict:
+        return {"precision": self.precision, "registers": base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HyperLogLog":
+        registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return cls(data["precision"], registers)
+
+
+class TDigest:
+    def __init__(self, delta: int = TDIGEST_DELTA, means=None, weights=None):
+        self.delta = delta
+        self.means = np.empty(0) if means is None else np.asarray(means, dtype=float)
+        self.weights = np.empty(0) if weights is None else np.asarray(weights, dtype=float)
+
+    def _k(self, q):
+        return self.delta / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k):
+        return (math.sin(min(k * 2 * math.pi / self.delta, math.pi / 2)) + 1) / 2
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        out_means, out_weights = [], []
+        cur_mean, cur_weight, q_start = means[0], weights[0], 0.0
+        q_limit = self._k_inverse(self._k(q_start) + 1)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if q_start + (cur_weight + weight) / total <= q_limit:
+                cur_mean += (mean - cur_mean) * weight / (cur_weight + weight)
+                cur_weight += weight
+            else:
+                out_means.append(cur_mean)
+                out_weights.append(cur_weight)
+                q_start += cur_weight / total
+                q_limit = self._k_inverse(self._k(q_start) + 1)
+                cur_mean, cur_weight = mean, weight
+        out_means.append(cur_mean)
+        out_weights.append(cur_weight)
+        self.means, self.weights = np.array(out_means), np.array(out_weights)
+
+    def add_values(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        # Pre-bin the sorted batch into many small equal-count centroids, then compress
+        values.sort()
+        num_bins = min(len(values), self.delta * 20)
+        starts = np.linspace(0, len(values), num_bins + 1).astype(np.int64)[:-1]
+        weights = np.diff(np.append(starts, len(values))).astype(float)
+        means = np.add.reduceat(values, starts) / weights
+        self._compress(np.concatenate([self.means, means]), np.concatenate([self.weights, weights]))
+
+    def merge(self, other: "TDigest"):
+        if len(other.means):
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q: float):
+        if len(self.means) == 0:
+            return None
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), cumulative, self.means))
+
+    def to_dict(self) -> dict:
+        return {"delta": self.delta, "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        return cls(data["delta"], data["means"], data["weights"])
+
+
+class ColumnSketch:
+    def __init__(self, duck_type: str, numeric: bool):
+        self.duck_type = duck_type
+        self.numeric = numeric
+        self.count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.hll = HyperLogLog()
+        self.digest = TDigest() if numeric and duck_type != "BOOLEAN" else None
+
+    def add_batch(self, hashes: np.ndarray, values: np.ndarray, nulls: int, rows: int):
+        # hashes/values hold the non-null entries of the column for this batch
+        self.count += rows
+        self.null_count += nulls
+        self.hll.add_hashes(hashes)
+        if self.numeric and len(values):
+            self.min = values.min().item() if self.min is None else min(self.min, values.min().item())
+            self.max = values.max().item() if self.max is None else max(self.max, values.max().item())
+            if self.digest is not None:
+                self.digest.add_values(values)
+
+    def merge(self, other: "ColumnSketch"):
+        self.count += other.count
+        self.null_count += other.null_count
+        self.hll.merge(other.hll)
+        for bound, pick in (("min", min), ("max", max)):
+            mine, theirs = getattr(self, bound), getattr(other, bound)
+            setattr(self, bound, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        if self.digest is not None and other.digest is not None:
+            self.digest.merge(other.digest)
+
+    def to_dict(self) -> dict:
+        return {
+            "duck_type": self.duck_type,
+            "numeric": self.numeric,
+            "count": self.count,
+            "null_count": self.null_count,
+            "min": self.min,
+            "max": self.max,
+            "hll": self.hll.to_dict(),
+            "tdigest": self.digest.to_dict() if self.digest is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnSketch":
+        sketch = cls(data["duck_type"], data["numeric"])
+        sketch.count, sketch.null_count = data["count"], data["null_count"]
+        sketch.min, sketch.max = data["min"], data["max"]
+        sketch.hll = HyperLogLog.from_dict(data["hll"])
+        sketch.digest = TDigest.from_dict(data["tdigest"]) if data["tdigest"] else None
+        return sketch
@@ -0,0 +1,120 @@
+import json
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter, ValidationError
+
+from validation.columnar import field_specs
+
+# Bounded-memory validation: records are read incrementally, validated a batch at
+# a time through a TypeAdapter(list[Model]), and valid rows / errors are appended
+# to their output files as each batch finishes.
+
+READ_CHUNK_SIZE = 1 << 20
+
+ARROW_TYPES = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+    date: pa.date32(),
+}
+
+
+def iter_json_lines(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_json_array(path: Path, chunk_size: int = READ_CHUNK_SIZE):
+    # Decode one element of a top-level JSON array at a time from a sliding buffer
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, started = "", 0, False
+        while True:
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if not started and pos < len(buffer):
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{path.name} is not a JSON array")
+                    started, pos = True, pos + 1
+                    continue
+                if pos < len(buffer) and buffer[pos] == "]":
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        raise
+                    break  # element continues in the next chunk
+                if end == len(buffer) and chunk:
+                    break  # may be a truncated scalar; decode again with more input
+                yield record
+                pos = end
+            if not chunk:
+                return
+
+
+def iter_records(path: Path):
+    return iter_json_lines(path) if path.suffix == ".jsonl" else iter_json_array(path)
+
+
+def iter_batches(records, batch_size: int):
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        yield batch
+
+
+def arrow_schema(schema) -> pa.Schema:
+    return pa.schema([
+        pa.field(name, ARROW_TYPES.get(base_type, pa.string()), nullable=nullable)
+        for name, base_type, nullable, _ in field_specs(schema)
+    ])
+
+
+def validate_batch(adapter: TypeAdapter, batch: list):
+    # Returns (valid models with their batch positions, {position: errors})
+    try:
+        return list(enumerate(adapter.validate_python(batch))), {}
+    except ValidationError as ve:
+        failed = {}
+        for error in ve.errors():
+            position, *loc = error["loc"]
+            failed.setdefault(position, []).append({**error, "loc": tuple(loc)})
+        keep = [i for i in range(len(batch)) if i not in failed]
+        models = adapter.validate_python([batch[i] for i in keep]) if keep else []
+        return list(zip(keep, models)), failed
+
+
+class JsonLinesSink:
+    def __init__(self, path: Path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, models):
+        self.file.writelines(m.model_dump_json() + "\n" for m in models)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    def __init__(self, path: Path, schema):
+        self.schema = arrow_schema(schema)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, models):
+        if models:
+            rows = [m.model_dump() for m in models]
+            self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
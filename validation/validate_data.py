@@ -1,7 +1,11 @@
 import os
 import json
+import argparse
+import pandas as pd
 from pathlib import Path
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
+from validation.columnar import validate_frame
+from validation.streaming import JsonLinesSink, ParquetSink, iter_batches, iter_records, validate_batch
 from validation.schema.all_schema import (
     Customer, Order, InventoryItem, Delivery, Feedback,
     Supplier, Product, Return, Employee
@@ -60,6 +64,104 @@ def validate_table(table_name: str):
     else:
         print(f"✅ {table_name}: All records are valid.")
 
+def validate_table_columnar(table_name: str):
+    schema = SCHEMA_MAP[table_name]
+    file_path = DATA_FOLDER / f"{table_name}.json"
+
+    if not file_path.exists():
+        print(f"❌ Failed to read {table_name}: No file found at {file_path}")
+        return
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Vectorized checks first; only flagged rows go through the model
+    df = pd.DataFrame.from_records(data)
+    coerced, needs_model = validate_frame(df, schema, data)
+
+    fallback_rows, errors = {}, []
+    for idx in needs_model[needs_model].index:
+        record = data[idx]
+        try:
+            fallback_rows[idx] = schema(**record).model_dump(mode="json")
+        except ValidationError as ve:
+            errors.append({
+                "index": int(idx),
+                "errors": ve.errors(),
+                "record": record
+            })
+
+    valid = coerced[~needs_model]
+    if fallback_rows:
+        fallback = pd.DataFrame.from_dict(fallback_rows, orient="index", columns=coerced.columns)
+        valid = pd.concat([valid.astype(object), fallback.astype(object)]).sort_index()
+    # Same writer as the row engine, so floats keep their full precision
+    valid_rows = valid.astype(object).where(valid.notna(), None).to_dict(orient="records")
+    with open(VALIDATED_FOLDER / f"{table_name}.json", "w", encoding="utf-8") as f:
+        json.dump(valid_rows, f, indent=2)
+
+    if errors:
+        with open(LOGS_FOLDER / f"{table_name}_errors.json", "w", encoding="utf-8") as f:
+            json.dump(errors, f, indent=2)
+        print(f"⚠️  {table_name}: {len(errors)} invalid rows logged.")
+    else:
+        print(f"✅ {table_name}: All records are valid.")
+
+def validate_table_streaming(table_name: str, batch_size: int = 10000, output_format: str = "jsonl"):
+    schema = SCHEMA_MAP[table_name]
+    # Prefer streamed NDJSON output from convert_to_json, fall back to the JSON array
+    file_path = next((p for p in (DATA_FOLDER / f"{table_name}.jsonl", DATA_FOLDER / f"{table_name}.json")
+                      if p.exists()), None)
+
+    if file_path is None:
+        print(f"❌ Failed to read {table_name}: No file found in {DATA_FOLDER}")
+        return
+
+    adapter = TypeAdapter(list[schema])
+    if output_format == "parquet":
+        valid_sink = ParquetSink(VALIDATED_FOLDER / f"{table_name}.parquet", schema)
+    else:
+        valid_sink = JsonLinesSink(VALIDATED_FOLDER / f"{table_name}.jsonl")
+    errors_path = LOGS_FOLDER / f"{table_name}_errors.jsonl"
+
+    offset, num_valid, num_errors = 0, 0, 0
+    try:
+        with open(errors_path, "w", encoding="utf-8") as errors_file:
+            for batch in iter_batches(iter_records(file_path), batch_size):
+                valid, failed = validate_batch(adapter, batch)
+                valid_sink.write([model for _, model in valid])
+                for position, errs in failed.items():
+                    errors_file.write(json.dumps({
+                        "index": offset + position,
+                        "errors": errs,
+                        "record": batch[position]
+                    }, default=str) + "\n")
+                offset += len(batch)
+                num_valid += len(valid)
+                num_errors += len(failed)
+    finally:
+        valid_sink.close()
+
+    if num_errors:
+        print(f"⚠️  {table_name}: {num_errors} invalid rows logged ({num_valid} valid).")
+    else:
+        errors_path.unlink()
+        print(f"✅ {table_name}: All {num_valid} records are valid.")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate JSON tables against the Pydantic schemas")
+    parser.add_argument("--engine", choices=["row", "columnar", "streaming"], default="row",
+                        help="row: Pydantic per record; columnar: vectorized checks, Pydantic only for flagged "
+                             "rows; streaming: batched TypeAdapter with bounded memory")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Records per batch (streaming engine)")
+    parser.add_argument("--output-format", choices=["jsonl", "parquet"], default="jsonl",
+                        help="Valid-row output format (streaming engine)")
+    args = parser.parse_args()
+
     for table in SCHEMA_MAP:
-        validate_table(table)
+        if args.engine == "streaming":
+            validate_table_streaming(table, args.batch_size, args.output_format)
+        elif args.engine == "columnar":
+            validate_table_columnar(table)
+        else:
+            validate_table(table)